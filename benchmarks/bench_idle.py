@@ -0,0 +1,104 @@
+"""
+空闲开销基准：打开 50 个终端标签页后保持空闲，分别在窗口有焦点、失去焦点和最小化时
+统计进程 CPU 时间、定时器唤醒次数、重绘次数和重绘面积。
+
+运行：QT_QPA_PLATFORM=offscreen uv run benchmarks/bench_idle.py [秒数]
+"""
+
+import resource
+import sys
+import time
+
+from PySide6.QtCore import QEvent, QEventLoop, QObject, QTimer
+from PySide6.QtWidgets import QApplication, QMainWindow, QTabWidget, QWidget
+
+from hterm.terminal import Terminal
+
+TABS = 50
+IDLE_SECONDS = 10
+
+
+class EventCounter(QObject):
+    """统计全局的定时器事件和终端视口的重绘"""
+
+    def __init__(self):
+        super().__init__()
+        self.timers = 0
+        self.paints = 0
+        self.painted_pixels = 0
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Timer:
+            self.timers += 1
+        elif event.type() == QEvent.Type.Paint and isinstance(obj.parent(), Terminal):
+            self.paints += 1
+            for rect in event.region():
+                self.painted_pixels += rect.width() * rect.height()
+        return False
+
+    def reset(self):
+        self.timers = self.paints = self.painted_pixels = 0
+
+
+def idle(seconds: float):
+    """运行事件循环 seconds 秒，期间进程只在有事件时被唤醒"""
+    loop = QEventLoop()
+    QTimer.singleShot(round(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+def measure(name: str, counter: EventCounter, seconds: float):
+    idle(0.5)
+    counter.reset()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = time.process_time()
+    idle(seconds)
+    cpu = time.process_time() - cpu
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    # 事件循环每被唤醒一次，进程就主动让出一次 CPU
+    wakeups = after.ru_nvcsw - usage.ru_nvcsw
+    print(
+        f"{name:>10}: cpu {cpu / seconds * 1000:6.2f} ms/s, "
+        f"wakeups {wakeups / seconds:6.1f}/s, "
+        f"timer events {counter.timers / seconds:6.1f}/s, "
+        f"paints {counter.paints / seconds:6.1f}/s, "
+        f"painted {counter.painted_pixels / seconds / 1000:8.1f} kpx/s"
+    )
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else IDLE_SECONDS
+    app = QApplication()
+    counter = EventCounter()
+    app.installEventFilter(counter)
+
+    window = QMainWindow()
+    tabs = QTabWidget()
+    window.setCentralWidget(tabs)
+    terminals = []
+    for i in range(TABS):
+        term = Terminal()
+        term.feed(f"tab {i}\r\n" + "\x1b[32muser@host\x1b[0m:~$ ls\r\n" * 20 + "$ ")
+        tabs.addTab(term, f"tab {i}")
+        terminals.append(term)
+    window.resize(1200, 800)
+    window.show()
+    window.activateWindow()
+    terminals[0].setFocus()
+
+    measure("focused", counter, seconds)
+
+    other = QWidget()
+    other.show()
+    other.activateWindow()
+    app.processEvents()
+    measure("unfocused", counter, seconds)
+
+    window.activateWindow()
+    terminals[0].setFocus()
+    window.showMinimized()
+    measure("minimized", counter, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+按键回显延迟基准：测量从 send_data 到主线程收到回显数据的耗时。
+
+运行：uv run benchmarks/bench_latency.py [次数]
+"""
+
+import statistics
+import sys
+import time
+
+from PySide6.QtCore import QCoreApplication, QTimer
+
+from hterm.channel import LocalChannel
+
+
+def main():
+    app = QCoreApplication()
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    channel = LocalChannel("cat")
+    samples = []
+    state = {"start": 0.0, "count": 0}
+
+    def send_key():
+        state["start"] = time.perf_counter()
+        channel.send_data("x")
+
+    def on_data_ready():
+        if b"x" not in channel.read():
+            return
+        samples.append((time.perf_counter() - state["start"]) * 1000)
+        state["count"] += 1
+        if state["count"] < rounds:
+            # 随机错开发送时刻，避免与轮询周期同步
+            QTimer.singleShot(1 + state["count"] % 7, send_key)
+        else:
+            app.quit()
+
+    channel.data_ready.connect(on_data_ready)
+    channel.open()
+    QTimer.singleShot(200, send_key)
+    app.exec()
+    channel.close()
+
+    samples.sort()
+    print(f"rounds: {len(samples)}")
+    print(f"mean:   {statistics.mean(samples):.3f} ms")
+    print(f"p50:    {samples[len(samples) // 2]:.3f} ms")
+    print(f"p99:    {samples[int(len(samples) * 0.99) - 1]:.3f} ms")
+    print(f"max:    {samples[-1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
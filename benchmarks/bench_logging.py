@@ -0,0 +1,95 @@
+"""
+会话日志开销基准：以 50 MB/s 的速率向 SessionLogger 写入带颜色控制序列的终端输出，
+分别统计调用方（接收线程）的耗时和整个进程的 CPU 占用（含后台写入线程，分为用户态和内核态），
+以及后台线程是否跟得上。
+
+text/timestamp 模式的开销主要是去除控制序列的正则替换，和控制序列的密度成正比。
+本例每 15 字节左右一个控制序列，约占 1.6% CPU / (MB/s)，
+50 MB/s 时单个写入线程已接近满载，会积压并丢弃数据。
+
+运行：uv run benchmarks/bench_logging.py [MB/s] [秒] [日志目录]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from hterm.session_log import (
+    LOG_MODE_RAW,
+    LOG_MODE_TEXT,
+    LOG_MODE_TIMESTAMP,
+    SessionLogger,
+)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def make_chunk() -> bytes:
+    line = b"\x1b[32muser@host\x1b[0m:\x1b[34m~/src\x1b[0m$ ls -l drwxr-xr-x 2 user\r\n"
+    return (line * (CHUNK_SIZE // len(line) + 1))[:CHUNK_SIZE]
+
+
+def run(mode: str | None, rate: float, duration: float, directory: str) -> dict:
+    chunk = make_chunk()
+    logger = SessionLogger(f"{directory}/{mode}.log", mode=mode) if mode else None
+    interval = CHUNK_SIZE / rate
+    caller_time = 0.0
+    sent = 0
+
+    cpu_start = os.times()
+    start = time.perf_counter()
+    next_at = start
+    while time.perf_counter() - start < duration:
+        t = time.perf_counter()
+        if logger:
+            logger.write(chunk)
+        caller_time += time.perf_counter() - t
+        sent += len(chunk)
+        next_at += interval
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    # 等待后台线程写完，计入全部 CPU 开销
+    if logger:
+        logger.close()
+    elapsed = time.perf_counter() - start
+    cpu_end = os.times()
+    user = cpu_end.user - cpu_start.user
+    system = cpu_end.system - cpu_start.system
+
+    return {
+        "mode": mode or "off",
+        "mb": sent / 1024 / 1024,
+        "caller_us_per_mb": caller_time / (sent / 1024 / 1024) * 1e6,
+        "cpu_percent": (user + system) / elapsed * 100,
+        "user_percent": user / elapsed * 100,
+        "system_percent": system / elapsed * 100,
+        "dropped": logger.dropped_bytes if logger else 0,
+        "drain": elapsed - duration,
+    }
+
+
+def main():
+    rate = float(sys.argv[1]) * 1024 * 1024 if len(sys.argv) > 1 else 50 * 1024 * 1024
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+
+    # 日志目录，传入 /dev/shm 等内存文件系统可以排除磁盘写入本身的开销
+    parent = sys.argv[3] if len(sys.argv) > 3 else None
+
+    print(
+        f"{'mode':>10} {'MB':>7} {'caller us/MB':>13} {'CPU %':>7} {'user %':>7} "
+        f"{'sys %':>7} {'drain s':>8} {'dropped':>9}"
+    )
+    with tempfile.TemporaryDirectory(dir=parent) as directory:
+        for mode in (None, LOG_MODE_RAW, LOG_MODE_TEXT, LOG_MODE_TIMESTAMP):
+            r = run(mode, rate, duration, directory)
+            print(
+                f"{r['mode']:>10} {r['mb']:>7.0f} {r['caller_us_per_mb']:>13.1f} "
+                f"{r['cpu_percent']:>7.1f} {r['user_percent']:>7.1f} "
+                f"{r['system_percent']:>7.1f} {r['drain']:>8.2f} {r['dropped']:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
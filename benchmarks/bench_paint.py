@@ -0,0 +1,119 @@
+"""
+终端绘制基准：在 300x80 的终端中测量
+  - 输入回显：每输入一个字符触发的重绘行数和 paintEvent 耗时
+  - 整屏重绘：满屏前景色、背景色交替的文本强制整屏重绘的耗时
+  - htop 重绘：类似 htop 的屏幕，整行同色背景上的多色文字和默认背景上的彩色进程列表
+
+运行：QT_QPA_PLATFORM=offscreen uv run benchmarks/bench_paint.py
+"""
+
+import statistics
+import time
+
+from PySide6.QtWidgets import QApplication
+
+from hterm.terminal import Terminal
+
+COLS = 300
+ROWS = 80
+KEYSTROKES = 200
+REDRAWS = 30
+
+
+class TimedTerminal(Terminal):
+    """记录每次 paintEvent 的耗时和重绘行数"""
+
+    def __init__(self):
+        super().__init__()
+        self.paint_times = []
+        self.painted_rows = []
+
+    def paintEvent(self, event):
+        t = time.perf_counter()
+        super().paintEvent(event)
+        self.paint_times.append(time.perf_counter() - t)
+        self.painted_rows.append(event.rect().height() / self.line_height)
+
+    def reset(self):
+        self.paint_times.clear()
+        self.painted_rows.clear()
+
+
+def colourful_screen(rows: int, cols: int) -> str:
+    """每行由多种前景色和背景色交替组成"""
+    lines = []
+    for y in range(rows):
+        cells = []
+        for x in range(0, cols, 10):
+            fg = 31 + (x // 10 + y) % 7
+            bg = 40 + (x // 10 + y * 3) % 8
+            cells.append(f"\x1b[{fg};{bg}m{f'cpu{x:03d}':<10}")
+        lines.append("".join(cells)[: cols * 12] + "\x1b[0m")
+    return "\x1b[H" + "\r\n".join(lines)
+
+
+def htop_screen(rows: int, cols: int) -> str:
+    """顶部是同一背景色上前景色交替的状态栏，下面是默认背景上的彩色进程列表"""
+    lines = []
+    for y in range(rows):
+        cells = []
+        if y < 4 or y == rows - 1:
+            for x in range(0, cols, 6):
+                cells.append(f"\x1b[{31 + x // 6 % 7};44m{'|' * 5} ")
+        else:
+            for x in range(0, cols, 15):
+                cells.append(f"\x1b[{31 + (x // 15 + y) % 7}m{f'proc{x:03d}':<14} ")
+        lines.append("".join(cells) + "\x1b[0m")
+    return "\x1b[H" + "\r\n".join(lines)
+
+
+def fit(term: Terminal, cols: int, rows: int):
+    """调整窗口大小直到屏幕恰好为 cols x rows"""
+    frame_w = term.width() - term.viewport().width()
+    frame_h = term.height() - term.viewport().height()
+    term.resize(
+        int(cols * term.char_width) + frame_w + 1, rows * term.line_height + frame_h
+    )
+    QApplication.processEvents()
+
+
+def report(name: str, term: TimedTerminal):
+    times = sorted(term.paint_times)
+    print(
+        f"{name:>12}: {len(times)} paints, rows/paint {statistics.mean(term.painted_rows):.1f}, "
+        f"p50 {statistics.median(times) * 1000:.2f} ms, "
+        f"p99 {times[int(len(times) * 0.99)] * 1000:.2f} ms"
+    )
+
+
+def main():
+    app = QApplication()
+    term = TimedTerminal()
+    term.show()
+    fit(term, COLS, ROWS)
+    print(f"screen: {term._screen.columns}x{term._screen.lines}")
+
+    term.feed(colourful_screen(ROWS - 1, COLS) + "\r\n$ ")
+    app.processEvents()
+
+    term.reset()
+    for i in range(KEYSTROKES):
+        term.feed("abcdefghij"[i % 10])
+        app.processEvents()
+    report("keystroke", term)
+
+    term.reset()
+    for _ in range(REDRAWS):
+        term.viewport().repaint()
+    report("full redraw", term)
+
+    term.feed(htop_screen(ROWS, COLS))
+    app.processEvents()
+    term.reset()
+    for _ in range(REDRAWS):
+        term.viewport().repaint()
+    report("htop redraw", term)
+
+
+if __name__ == "__main__":
+    main()
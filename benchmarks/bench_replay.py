@@ -0,0 +1,70 @@
+"""
+录像回放吞吐量基准：以“最快”速度回放 asciicast 录像，测量终端解析和绘制真实流量的速度。
+不指定录像文件时生成一段带颜色的 ls 输出作为测试数据。
+
+运行：QT_QPA_PLATFORM=offscreen uv run benchmarks/bench_replay.py [录像文件]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from PySide6.QtWidgets import QApplication
+
+from hterm.session import Session
+
+
+def make_cast(path: str, size: int = 4 * 1024 * 1024):
+    """生成约 size 字节输出的测试录像"""
+    line = "\x1b[01;34mdrwxr-xr-x\x1b[0m  2 user user 4096 Oct 18 07:27 \x1b[01;32msrc\x1b[0m\r\n"
+    chunk = line * 64
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"version": 2, "width": 120, "height": 40}) + "\n")
+        for i in range(size // len(chunk)):
+            f.write(json.dumps([i * 0.001, "o", chunk]) + "\n")
+
+
+def main():
+    app = QApplication()
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "bench.cast")
+        make_cast(path)
+
+    size = 0
+    with open(path, encoding="utf-8") as f:
+        next(f)
+        for line in f:
+            event = json.loads(line)
+            if event[1] == "o":
+                size += len(event[2].encode())
+
+    session = Session({"type": "replay", "path": path, "speed": 0})
+    session.resize(1200, 800)
+    session.show()
+    frames = 0
+    render_frame = session.terminal.render_frame
+
+    def counting_render_frame():
+        nonlocal frames
+        frames += 1
+        render_frame()
+
+    session.terminal.frame_timer.timeout.disconnect()
+    session.terminal.frame_timer.timeout.connect(counting_render_frame)
+    start = time.perf_counter()
+    session.channel.disconnected.connect(app.quit)
+    app.exec()
+    elapsed = time.perf_counter() - start
+    session.release()
+
+    print(f"replayed:   {size / 1024 / 1024:.1f} MB in {elapsed:.2f} s")
+    print(f"throughput: {size / elapsed / 1024 / 1024:.1f} MB/s")
+    print(f"frames:     {frames} ({frames / elapsed:.0f} fps)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+会话数量扩展基准：同时打开 N 个本地会话，每个会话每 200 ms 输出一行 80 列的文本，
+每个会话接一个 Terminal，与界面一样按帧从接收缓冲区取数据解析，只有第一个标签页可见并绘制。
+每个会话的输出速率固定，总量不超过界面的解析能力，测量的是会话数量本身带来的开销。统计
+  - 聚合吞吐量：所有终端解析的字节数，跟得上时等于 N 个会话的输出速率之和
+  - 帧耗时：每个终端一次 render_frame（取数据和解析）的耗时分位数
+  - 绘制耗时：可见终端 paintEvent 的耗时分位数
+  - 界面停顿：主线程事件循环两次空闲之间的最大间隔，即按键最坏要等多久才被处理
+  - 进程 CPU：本进程占用的 CPU 比例
+
+运行：QT_QPA_PLATFORM=offscreen uv run benchmarks/bench_scaling.py [N1 N2 ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QApplication
+
+from hterm.channel import LocalChannel
+from hterm.terminal import Terminal
+
+DURATION = 3  # 每轮测试时长（秒）
+WARMUP = 0.5  # 预热时长（秒）
+PROBE_INTERVAL = 5  # 探测事件循环停顿的计时器间隔（毫秒）
+# 每个会话运行的输出脚本：每 200 ms 输出一行 80 列文本
+PRODUCER = """#!/usr/bin/env perl
+$| = 1;
+while (1) { print "x" x 79, "\\n"; select(undef, undef, undef, 0.2) }
+"""
+
+
+class TimedTerminal(Terminal):
+    """记录每次 render_frame 和 paintEvent 的耗时及解析的字节数"""
+
+    def __init__(self):
+        super().__init__()
+        self.frame_times = []
+        self.paint_times = []
+        self.parsed = 0
+
+    def render_frame(self):
+        t = time.perf_counter()
+        super().render_frame()
+        self.frame_times.append(time.perf_counter() - t)
+
+    def parse(self, data: bytes | str):
+        self.parsed += len(data)
+        super().parse(data)
+
+    def paintEvent(self, event):
+        t = time.perf_counter()
+        super().paintEvent(event)
+        self.paint_times.append(time.perf_counter() - t)
+
+    def reset(self):
+        self.frame_times.clear()
+        self.paint_times.clear()
+        self.parsed = 0
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def run(app: QApplication, count: int, producer: str) -> dict:
+    sessions = []
+    for _ in range(count):
+        terminal = TimedTerminal()
+        terminal.resize(800, 600)
+        channel = LocalChannel(producer)
+        terminal.data_source = channel.read
+        channel.data_ready.connect(terminal.request_frame)
+        channel.open()
+        sessions.append((terminal, channel))
+    # 只有当前标签页可见
+    sessions[0][0].show()
+
+    gaps = []
+    last = time.perf_counter()
+
+    def probe():
+        nonlocal last
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+
+    probe_timer = QTimer()
+    probe_timer.timeout.connect(probe)
+    probe_timer.start(PROBE_INTERVAL)
+
+    state = {}
+
+    def reset():
+        # 预热结束后重新计数
+        for terminal, _ in sessions:
+            terminal.reset()
+        gaps.clear()
+        state["start"] = time.perf_counter()
+        state["cpu"] = sum(os.times()[:2])
+
+    QTimer.singleShot(round(WARMUP * 1000), reset)
+    QTimer.singleShot(round((WARMUP + DURATION) * 1000), app.quit)
+    app.exec()
+    elapsed = time.perf_counter() - state["start"]
+    cpu = sum(os.times()[:2]) - state["cpu"]
+    probe_timer.stop()
+
+    for terminal, channel in sessions:
+        channel.close()
+        terminal.deleteLater()
+    app.processEvents()
+
+    frames = [t for terminal, _ in sessions for t in terminal.frame_times]
+    paints = sessions[0][0].paint_times
+    return {
+        "sessions": count,
+        "throughput_mb_s": sum(t.parsed for t, _ in sessions) / elapsed / 1024**2,
+        "frame_p50_ms": percentile(frames, 0.5) * 1000,
+        "frame_p99_ms": percentile(frames, 0.99) * 1000,
+        "paint_p50_ms": percentile(paints, 0.5) * 1000,
+        "stall_max_ms": max(gaps, default=0) * 1000,
+        "cpu_percent": cpu / elapsed * 100,
+    }
+
+
+def report(r: dict):
+    print(
+        f"{r['sessions']:>5} {r['throughput_mb_s']:>8.2f} "
+        f"{r['frame_p50_ms']:>8.2f}ms {r['frame_p99_ms']:>8.2f}ms "
+        f"{r['paint_p50_ms']:>8.2f}ms {r['stall_max_ms']:>8.1f}ms "
+        f"{r['cpu_percent']:>6.1f}"
+    )
+
+
+def main():
+    app = QApplication()
+    counts = [int(n) for n in sys.argv[1:]] or [1, 10, 50, 100, 200]
+    print(
+        f"{'N':>5} {'MB/s':>8} {'frame p50':>10} {'frame p99':>10} "
+        f"{'paint p50':>10} {'stall max':>10} {'CPU %':>6}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        producer = os.path.join(tmp, "producer.pl")
+        with open(producer, "w") as f:
+            f.write(PRODUCER)
+        os.chmod(producer, 0o755)
+        for count in counts:
+            report(run(app, count, producer))
+
+
+if __name__ == "__main__":
+    main()
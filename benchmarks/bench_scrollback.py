@@ -0,0 +1,120 @@
+"""
+滚动历史内存基准：向 200 列的屏幕输出 1 万行带颜色的文本，
+比较 pyte 默认的逐单元格字典存储和 CompactHistory 紧凑存储占用的内存，以及压缩和还原的耗时；
+再向 DiskHistory 追加大量行，测量溢出到磁盘后的内存占用和随机滚动一屏的读取耗时。
+
+运行：uv run benchmarks/bench_scrollback.py [行数] [磁盘行数]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+import pyte
+
+from hterm.scrollback import CompactHistory, DiskHistory
+
+COLS = 200
+ROWS = 50
+SCROLLS = 200
+
+
+def make_output(lines: int) -> str:
+    """类似 ls --color 的输出，每行填满 200 列"""
+    out = []
+    for i in range(lines):
+        name = f"file{i:06d}.txt"
+        out.append(
+            f"-rw-r--r-- 1 user user {i * 37 % 100000:>8} Oct 18 07:27 "
+            f"\x1b[01;32m{name}\x1b[0m \x1b[34m{'x' * 60}\x1b[0m {'y' * 80}"[
+                : COLS + 20
+            ]
+        )
+    return "\r\n".join(out) + "\r\n"
+
+
+def measure(name: str, history, data: str, lines: int):
+    screen = pyte.Screen(COLS, ROWS, lines)
+    screen.top_buffer = history
+    stream = pyte.Stream(screen)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    stream.feed(data)
+    elapsed = time.perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    count = len(history)
+    print(
+        f"{name:>8}: {count} lines, {used / 1024 / 1024:7.1f} MB "
+        f"({used / count:6.0f} B/line), feed {elapsed:.2f} s"
+    )
+    return history
+
+
+def measure_disk(lines: int, memory_lines: int):
+    """直接追加预先生成的行，跳过解析，只测存储本身"""
+    screen = pyte.Screen(COLS, ROWS, 1)
+    pyte.Stream(screen).feed(make_output(ROWS)[:-2])
+    rows = [screen.buffer[y] for y in range(ROWS)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = DiskHistory(os.path.join(tmp, "bench"), memory_lines)
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        for i in range(lines):
+            history.append(rows[i % ROWS])
+        elapsed = time.perf_counter() - start
+        used = tracemalloc.get_traced_memory()[0] - base
+
+        # 随机跳到磁盘部分的某一屏，取出并还原整屏的行
+        times = []
+        for _ in range(SCROLLS):
+            top = random.randrange(history.spilled - ROWS)
+            t = time.perf_counter()
+            for i in range(top, top + ROWS):
+                history.line(i).materialize()
+            times.append(time.perf_counter() - t)
+        peak = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+
+        size = history.disk_size
+        history.close()
+
+    times.sort()
+    print(
+        f"{'disk':>8}: {lines} lines ({history.spilled} on disk, {size / 1024 / 1024:.0f} MB), "
+        f"{used / 1024 / 1024:.1f} MB in memory, append {elapsed / lines * 1e6:.0f} us/line"
+    )
+    print(
+        f"{'scroll':>8}: {ROWS} rows from disk p50 {times[len(times) // 2] * 1000:.2f} ms, "
+        f"p99 {times[int(len(times) * 0.99)] * 1000:.2f} ms, "
+        f"memory after scrolling {peak / 1024 / 1024:.1f} MB"
+    )
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    disk_lines = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    data = make_output(lines + ROWS)
+    measure("deque", deque(maxlen=lines), data, lines)
+    history = measure("compact", CompactHistory(lines), data, lines)
+
+    start = time.perf_counter()
+    for i in range(0, len(history), 10):
+        history.line(i).materialize()
+    elapsed = (time.perf_counter() - start) / (len(history) / 10)
+    print(f"materialize: {elapsed * 1e6:.0f} us/line")
+
+    measure_disk(disk_lines, lines)
+
+
+if __name__ == "__main__":
+    main()
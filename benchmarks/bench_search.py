@@ -0,0 +1,100 @@
+"""
+搜索基准：在 1 万行历史的 200 列终端中
+  - 每次按键修改查询后，后台线程完成整个历史和屏幕搜索的耗时
+  - 对比逐格还原历史行再拼接文本的做法，单是准备文本的耗时
+  - 搜索开启时持续输出，每帧增量提交新行带来的额外解析耗时
+
+运行：QT_QPA_PLATFORM=offscreen uv run benchmarks/bench_search.py
+"""
+
+import statistics
+import time
+
+from bench_paint import fit
+from PySide6.QtWidgets import QApplication
+
+from hterm.terminal import HISTORY_LINES, Terminal
+
+COLS = 200
+ROWS = 50
+QUERY = "kernel: usb 1-1"
+STREAM_FRAMES = 100
+STREAM_LINES = 20
+
+
+def log_line(i: int) -> str:
+    """类似串口内核日志的输出"""
+    event = "new high-speed USB device" if i % 50 == 0 else "eth0 link is up"
+    return f"[{i * 0.013:12.6f}] kernel: usb 1-{i % 4}: {event} number {i}"
+
+
+def wait_search(app: QApplication, term: Terminal) -> float:
+    """等待后台线程处理完队列中的所有任务"""
+    start = time.perf_counter()
+    while not term.searcher._queue.empty():
+        app.processEvents()
+        time.sleep(0.0005)
+    app.processEvents()
+    return time.perf_counter() - start
+
+
+def main():
+    app = QApplication()
+    term = Terminal()
+    term.show()
+    fit(term, COLS, ROWS)
+    term.feed("\r\n".join(log_line(i) for i in range(HISTORY_LINES + ROWS)))
+    app.processEvents()
+    print(
+        f"screen: {term._screen.columns}x{term._screen.lines}, history {len(term.history)}"
+    )
+
+    searcher = term.searcher
+    times = []
+    total = [0]
+    searcher.changed.connect(lambda position, count: total.__setitem__(0, count))
+    for i in range(1, len(QUERY) + 1):
+        start = time.perf_counter()
+        searcher.set_query(QUERY[:i])
+        submit = time.perf_counter() - start
+        times.append((submit, submit + wait_search(app, term)))
+    submits = [t[0] * 1000 for t in times]
+    totals = [t[1] * 1000 for t in times]
+    print(
+        f"{'keystroke':>12}: submit p50 {statistics.median(submits):.2f} ms, "
+        f"search done p50 {statistics.median(totals):.1f} ms, "
+        f"max {max(totals):.1f} ms, {total[0]} matches for {QUERY!r}"
+    )
+
+    history = term.history
+    start = time.perf_counter()
+    for i in range(len(history)):
+        line = history[i]
+        "".join(line[x].data for x in range(COLS))
+    print(
+        f"{'from cells':>12}: {(time.perf_counter() - start) * 1000:.1f} ms per query"
+    )
+
+    for active in (False, True):
+        if not active:
+            searcher.set_query("")
+        else:
+            searcher.set_query("link")
+            wait_search(app, term)
+        samples = []
+        for frame in range(STREAM_FRAMES):
+            data = "\r\n" + "\r\n".join(
+                log_line(frame * STREAM_LINES + i) for i in range(STREAM_LINES)
+            )
+            start = time.perf_counter()
+            term.feed(data)
+            samples.append(time.perf_counter() - start)
+            wait_search(app, term)
+        print(
+            f"{'stream':>12}: search {'on ' if active else 'off'}, "
+            f"{STREAM_LINES} lines/frame, feed p50 {statistics.median(samples) * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+串口吞吐量基准：用 os.openpty() 的一对伪终端模拟串口设备，
+主端以最快速度写入数据，SerialChannel 打开从端读取，界面侧按 60 帧取走数据。
+
+运行：uv run benchmarks/bench_serial.py [MB]
+"""
+
+import os
+import sys
+import threading
+import time
+import tty
+
+from PySide6.QtCore import QCoreApplication, Qt, QTimer
+
+from hterm.channel import SerialChannel
+
+
+def main():
+    app = QCoreApplication()
+    total = int(sys.argv[1]) * 1024 * 1024 if len(sys.argv) > 1 else 32 * 1024 * 1024
+
+    master, slave = os.openpty()
+    # 原始模式，避免行规程改写数据
+    tty.setraw(slave)
+    channel = SerialChannel(os.ttyname(slave), 921600)
+    channel.open()
+    while not channel.is_connected:
+        time.sleep(0.01)
+
+    def produce():
+        chunk = b"0123456789abcdef" * 4096
+        sent = 0
+        while sent < total:
+            sent += os.write(master, chunk[: total - sent])
+
+    received = 0
+    start = time.perf_counter()
+
+    def on_frame():
+        nonlocal received
+        received += len(channel.read())
+        if received >= total:
+            app.quit()
+
+    timer = QTimer()
+    timer.setTimerType(Qt.TimerType.PreciseTimer)
+    timer.timeout.connect(on_frame)
+    timer.start(16)
+    threading.Thread(target=produce, daemon=True).start()
+    app.exec()
+    elapsed = time.perf_counter() - start
+    channel.close()
+
+    rate = received / elapsed
+    stats = channel.rx_buffer.stats()
+    print(f"received:   {received / 1024 / 1024:.1f} MB in {elapsed:.2f} s")
+    print(
+        f"throughput: {rate / 1024 / 1024:.1f} MB/s (~{rate * 10 / 1e6:.0f} Mbaud 8N1)"
+    )
+    print(f"high water: {stats['high_water']} bytes")
+    print(f"throttled:  {stats['throttled_time']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+本地会话启动延迟基准：逐步增大进程常驻内存，比较 pty.fork 和 posix_spawn/subprocess
+两种方式从启动到收到子进程第一个输出字节的时间。
+
+运行：uv run benchmarks/bench_spawn.py [最大 MB]
+"""
+
+import os
+import resource
+import select
+import signal
+import statistics
+import sys
+import time
+
+from hterm.channel import LocalChannel
+
+ROUNDS = 20
+STEP_MB = 256
+
+
+def first_output_latency(channel: LocalChannel, start) -> float:
+    """启动子进程并等待第一个输出字节，返回毫秒数"""
+    t = time.perf_counter()
+    pid, fd = start(["/bin/echo", "ready"])
+    select.select([fd], [], [])
+    try:
+        os.read(fd, 64)
+    except OSError:
+        # 子进程已经输出并退出，从端关闭后读取返回 EIO
+        pass
+    elapsed = (time.perf_counter() - t) * 1000
+    os.kill(pid, signal.SIGHUP)
+    os.waitpid(pid, 0)
+    os.close(fd)
+    return elapsed
+
+
+def spawn_method(channel: LocalChannel):
+    """当前平台 LocalChannel 实际使用的非 fork 启动方式"""
+    try:
+        first_output_latency(channel, channel.spawn)
+        return channel.spawn, "posix_spawn"
+    except NotImplementedError:
+        return channel.spawn_subprocess, "subprocess"
+
+
+def main():
+    max_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    channel = LocalChannel("/bin/sh")
+    spawn, spawn_name = spawn_method(channel)
+
+    ballast = []
+    print(
+        f"{'RSS MB':>7} {'fork p50':>9} {'fork p99':>9} "
+        f"{spawn_name + ' p50':>15} {spawn_name + ' p99':>15}"
+    )
+    for size in range(0, max_mb + 1, STEP_MB):
+        while len(ballast) * 64 < size:
+            # 写满每一页，保证内存真正驻留
+            ballast.append(bytearray(b"\x01" * (64 * 1024 * 1024)))
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        results = {}
+        for name, start in (("fork", channel.fork), (spawn_name, spawn)):
+            samples = sorted(
+                first_output_latency(channel, start) for _ in range(ROUNDS)
+            )
+            results[name] = (
+                statistics.median(samples),
+                samples[int(len(samples) * 0.99)],
+            )
+        print(
+            f"{rss:>7.0f} {results['fork'][0]:>9.2f} {results['fork'][1]:>9.2f} "
+            f"{results[spawn_name][0]:>15.2f} {results[spawn_name][1]:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
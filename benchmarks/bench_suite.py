@@ -0,0 +1,404 @@
+"""
+渲染和解析基准套件：在离屏平台上把预先生成的工作负载逐帧交给 Terminal.feed，
+每帧之后处理事件强制执行 paintEvent，测量解析吞吐、帧耗时分位数和 Python 堆内存峰值。
+
+工作负载：
+  - plain：大量纯文本日志
+  - color：每个单元格都带 256 色或真彩色前景色和背景色
+  - cjk：以中文为主的宽字符输出
+  - htop：htop 式按坐标刷新部分行和计量条
+  - vim：vim 式滚动区域内逐行滚动、刷新状态栏和整页翻页
+  - scroll：在 1 万行历史中快速滚动
+
+结果可写成 JSON，并与之前的结果比较，解析吞吐、帧耗时中位数或内存峰值变差超过阈值时返回 1，
+发布打包前据此发现 terminal.py 的性能回退。
+
+运行：QT_QPA_PLATFORM=offscreen uv run benchmarks/bench_suite.py [工作负载 ...]
+      [--json 结果.json] [--compare 之前的结果.json] [--threshold 0.25] [--scale 1]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import PySide6
+from bench_paint import TimedTerminal, fit, htop_screen
+from PySide6.QtWidgets import QApplication
+
+from hterm.terminal import FRAME_CHUNK_BYTES
+
+COLS = 200
+ROWS = 50
+SEED = 2024
+
+# 与基准比较的指标，1 表示越大越好，-1 表示越小越好
+COMPARED_METRICS = {
+    "parse_mb_s": 1,
+    "frame_p50_ms": -1,
+    "paint_p50_ms": -1,
+    "peak_mb": -1,
+}
+# 默认的回退阈值，指标变差超过此比例视为回退
+DEFAULT_THRESHOLD = 0.25
+
+
+class BenchTerminal(TimedTerminal):
+    """在 TimedTerminal 的基础上统计解析耗时"""
+
+    def __init__(self):
+        super().__init__()
+        self.parse_time = 0.0
+
+    def parse(self, data: bytes | str):
+        t = time.perf_counter()
+        super().parse(data)
+        self.parse_time += time.perf_counter() - t
+
+
+def chunked(data: str, size: int = FRAME_CHUNK_BYTES) -> list[bytes]:
+    """按每帧读取的字节数切分，多字节字符可能被切开，由增量解码器拼接"""
+    raw = data.encode()
+    return [raw[i : i + size] for i in range(0, len(raw), size)]
+
+
+def log_lines(count: int) -> list[bytes]:
+    lines = []
+    for i in range(count):
+        lines.append(
+            f"[{i * 0.013:12.6f}] kernel: usb 1-{i % 4}: new high-speed USB device "
+            f"number {i} using xhci_hcd, vendor 0x{i * 7 % 65536:04x}"
+        )
+    return chunked("\r\n".join(lines) + "\r\n")
+
+
+def plain_log(scale: float) -> list[bytes]:
+    return log_lines(int(30000 * scale))
+
+
+def dense_color(scale: float) -> list[bytes]:
+    """奇数列用 256 色，偶数列用真彩色，每个单元格都切换一次样式"""
+    lines = []
+    for y in range(int(600 * scale)):
+        cells = []
+        for x in range(COLS):
+            n = (x + y) % 256
+            if x % 2:
+                cells.append(f"\x1b[38;5;{n};48;5;{255 - n}m#")
+            else:
+                cells.append(f"\x1b[38;2;{n};{x};{y % 256};48;2;0;{n // 2};64m@")
+        lines.append("".join(cells) + "\x1b[0m")
+    return chunked("\r\n".join(lines) + "\r\n")
+
+
+def cjk_text(scale: float) -> list[bytes]:
+    """每行约 90 个中文字符夹杂少量 ASCII，占满 200 列中的大部分"""
+    words = "终端模拟器解析宽字符时每个汉字占两个单元格，渲染需要按列对齐。"
+    lines = []
+    for i in range(int(10000 * scale)):
+        start = i % len(words)
+        text = (words * 4)[start : start + 90]
+        lines.append(f"{i:06d} {text}")
+    return chunked("\r\n".join(lines) + "\r\n")
+
+
+def htop_trace(scale: float) -> list[bytes]:
+    """先画整屏，之后每帧刷新顶部计量条并重写约三分之一的进程行"""
+    rng = random.Random(SEED)
+    frames = [htop_screen(ROWS, COLS).encode()]
+    for _ in range(int(300 * scale)):
+        out = []
+        for y in range(4):
+            used = rng.randrange(COLS - 20)
+            out.append(
+                f"\x1b[{y + 1};1H\x1b[1m{y:>3}\x1b[0m[\x1b[32m{'|' * used}"
+                f"\x1b[31m{'|' * (used // 4)}\x1b[0m\x1b[K"
+            )
+        for y in rng.sample(range(5, ROWS - 1), (ROWS - 6) // 3):
+            pid = rng.randrange(1, 99999)
+            cpu = rng.random() * 100
+            out.append(
+                f"\x1b[{y + 1};1H\x1b[36m{pid:>7}\x1b[0m user      20   0 "
+                f"\x1b[1m{cpu:5.1f}\x1b[0m {rng.random() * 10:4.1f} "
+                f"\x1b[32m{'python3 benchmarks/bench_suite.py':<{COLS - 40}}\x1b[0m"
+            )
+        out.append(f"\x1b[{ROWS};1H\x1b[30;46mF1Help  F2Setup  F10Quit\x1b[0m\x1b[K")
+        frames.append("".join(out).encode())
+    return frames
+
+
+def vim_line(no: int) -> str:
+    """带行号和语法高亮的一行代码"""
+    return (
+        f"\x1b[33m{no:>5} \x1b[0m\x1b[35mdef\x1b[0m \x1b[36mhandler_{no}\x1b[0m"
+        f"(self, value: \x1b[32mint\x1b[0m = \x1b[31m{no}\x1b[0m):  "
+        f"\x1b[34m# {'comment ' * (no % 12)}\x1b[0m"
+    )
+
+
+def vim_trace(scale: float) -> list[bytes]:
+    """在滚动区域中逐行向下滚动并刷新状态栏，每 25 帧清屏重画一页"""
+    body = ROWS - 1
+    frames = [
+        ("\x1b[2J\x1b[H" + "\r\n".join(vim_line(no) for no in range(body))).encode()
+    ]
+    top = 0
+    for i in range(int(600 * scale)):
+        if i % 25 == 24:
+            # Ctrl+F 翻页
+            top += body
+            out = "\x1b[2J\x1b[H" + "\r\n".join(
+                vim_line(no) for no in range(top, top + body)
+            )
+        else:
+            top += 1
+            out = f"\x1b[1;{body}r\x1b[{body};1H\n{vim_line(top + body - 1)}\x1b[r"
+        status = f"benchmarks/bench_suite.py  {top + 1},1  {top * 100 // 10000}%"
+        out += f"\x1b[{ROWS};1H\x1b[7m{status:<{COLS}}\x1b[0m\x1b[{body};1H"
+        frames.append(out.encode())
+    return frames
+
+
+WORKLOADS = {
+    "plain": plain_log,
+    "color": dense_color,
+    "cjk": cjk_text,
+    "htop": htop_trace,
+    "vim": vim_trace,
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def new_terminal() -> BenchTerminal:
+    term = BenchTerminal()
+    term.show()
+    fit(term, COLS, ROWS)
+    return term
+
+
+def dispose(term: BenchTerminal):
+    term.close()
+    term.deleteLater()
+    QApplication.processEvents()
+
+
+def replay(frames: list[bytes]) -> tuple[BenchTerminal, list[float]]:
+    """逐帧喂数据并立即处理绘制事件，返回终端和每帧的总耗时"""
+    app = QApplication.instance()
+    term = new_terminal()
+    term.reset()
+    frame_times = []
+    for data in frames:
+        t = time.perf_counter()
+        term.feed(data)
+        app.processEvents()
+        frame_times.append(time.perf_counter() - t)
+    return term, frame_times
+
+
+def scroll_steps(term: BenchTerminal, steps: int) -> list[float]:
+    """交替滚轮滚动和翻页，跳到历史中的随机位置，每步都重绘整个视口"""
+    app = QApplication.instance()
+    rng = random.Random(SEED)
+    scrollbar = term.verticalScrollBar()
+    frame_times = []
+    for i in range(steps):
+        if i % 10 == 9:
+            value = rng.randrange(scrollbar.maximum())
+        elif i % 3:
+            value = scrollbar.value() - 3
+        else:
+            value = scrollbar.value() - ROWS
+        t = time.perf_counter()
+        scrollbar.setValue(value if value >= 0 else scrollbar.maximum())
+        app.processEvents()
+        frame_times.append(time.perf_counter() - t)
+    return frame_times
+
+
+def run_scroll(scale: float) -> tuple[BenchTerminal, list[float]]:
+    """先输出 1 万行历史，再测量滚动时每一步的耗时"""
+    term = new_terminal()
+    for data in log_lines(int(10000 * scale)):
+        term.feed(data)
+    QApplication.processEvents()
+    term.reset()
+    return term, scroll_steps(term, int(300 * scale))
+
+
+def measure_memory(frames: list[bytes]) -> float:
+    """在新终端中重放一遍，用 tracemalloc 记录 Python 堆的峰值增量 (MB)"""
+    app = QApplication.instance()
+    term = new_terminal()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for data in frames:
+        term.feed(data)
+        app.processEvents()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    dispose(term)
+    return peak / 1024 / 1024
+
+
+def measure_scroll_memory(scale: float) -> float:
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    term = new_terminal()
+    for data in log_lines(int(10000 * scale)):
+        term.feed(data)
+    scroll_steps(term, int(300 * scale))
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    dispose(term)
+    return peak / 1024 / 1024
+
+
+def summarize(result: dict, term: BenchTerminal, frame_times: list[float]) -> dict:
+    paint_times = term.paint_times or [0.0]
+    result.update(
+        {
+            "frame_p50_ms": statistics.median(frame_times) * 1000,
+            "frame_p95_ms": percentile(frame_times, 0.95) * 1000,
+            "frame_p99_ms": percentile(frame_times, 0.99) * 1000,
+            "frame_max_ms": max(frame_times) * 1000,
+            "paints": len(term.paint_times),
+            "paint_p50_ms": statistics.median(paint_times) * 1000,
+            "paint_p99_ms": percentile(paint_times, 0.99) * 1000,
+        }
+    )
+    return result
+
+
+def run(name: str, scale: float) -> dict:
+    if name == "scroll":
+        term, frame_times = run_scroll(scale)
+        result = {"bytes": 0, "frames": len(frame_times), "parse_mb_s": None}
+        result = summarize(result, term, frame_times)
+        dispose(term)
+        result["peak_mb"] = measure_scroll_memory(scale)
+        return result
+
+    frames = WORKLOADS[name](scale)
+    size = sum(map(len, frames))
+    term, frame_times = replay(frames)
+    result = {
+        "bytes": size,
+        "frames": len(frames),
+        "parse_mb_s": size / term.parse_time / 1024 / 1024,
+    }
+    result = summarize(result, term, frame_times)
+    dispose(term)
+    result["peak_mb"] = measure_memory(frames)
+    return result
+
+
+def report(name: str, result: dict):
+    parse = result["parse_mb_s"]
+    print(
+        f"{name:>6}: {result['bytes'] / 1024 / 1024:6.1f} MB "
+        f"{result['frames']:5d} frames, "
+        f"parse {'-' if parse is None else f'{parse:.2f}':>6} MB/s, "
+        f"frame p50 {result['frame_p50_ms']:6.2f} ms "
+        f"p95 {result['frame_p95_ms']:6.2f} ms p99 {result['frame_p99_ms']:6.2f} ms, "
+        f"paint p50 {result['paint_p50_ms']:6.2f} ms, "
+        f"peak {result['peak_mb']:6.1f} MB"
+    )
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """返回超过阈值的回退描述"""
+    regressions = []
+    if baseline.get("scale") != results["scale"]:
+        print(f"基准的 scale 为 {baseline.get('scale')}，与本次不同，不做比较")
+        return regressions
+    for name, result in results["workloads"].items():
+        base = baseline.get("workloads", {}).get(name)
+        if not base:
+            continue
+        for metric, direction in COMPARED_METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            mark = ""
+            if change * direction < -threshold:
+                mark = "  <-- 回退"
+                regressions.append(f"{name}.{metric}: {old:.2f} -> {new:.2f}")
+            print(
+                f"{name:>6}.{metric:<13} {old:9.2f} -> {new:9.2f} ({change:+.0%}){mark}"
+            )
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="终端渲染和解析基准套件")
+    parser.add_argument(
+        "workloads",
+        nargs="*",
+        help=f"只运行指定的工作负载：{', '.join([*WORKLOADS, 'scroll'])}，默认全部",
+    )
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    parser.add_argument("--compare", help="与之前写出的 JSON 结果比较")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"判定回退的变化比例，默认 {DEFAULT_THRESHOLD}",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="按比例缩放各工作负载的数据量"
+    )
+    args = parser.parse_args()
+    for name in args.workloads:
+        if name not in WORKLOADS and name != "scroll":
+            parser.error(f"未知的工作负载：{name}")
+    return args
+
+
+def main():
+    args = parse_args()
+    app = QApplication()
+    names = args.workloads or [*WORKLOADS, "scroll"]
+    print(f"screen: {COLS}x{ROWS}, scale {args.scale}")
+
+    results = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "pyside": PySide6.__version__,
+        "qpa": app.platformName(),
+        "columns": COLS,
+        "lines": ROWS,
+        "scale": args.scale,
+        "workloads": {},
+    }
+    for name in names:
+        results["workloads"][name] = run(name, args.scale)
+        report(name, results["workloads"][name])
+
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} 项指标回退超过 {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
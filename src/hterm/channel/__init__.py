@@ -1,5 +1,6 @@
 from hterm.channel.channel_local import LocalChannel
 from hterm.channel.channel_pty import PtyChannel
+from hterm.channel.channel_replay import ReplayChannel
 from hterm.channel.channel_serial import SerialChannel
 from hterm.channel.channel_ssh import SshChannel
 
@@ -8,4 +9,5 @@ __all__ = [
     "SshChannel",
     "LocalChannel",
     "SerialChannel",
+    "ReplayChannel",
 ]
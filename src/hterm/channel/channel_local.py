@@ -1,4 +1,6 @@
+import codecs
 import os
+import subprocess
 import sys
 
 from hterm.channel.channel_pty import PtyChannel
@@ -8,43 +10,170 @@ if sys.platform == "win32":
 else:
     import fcntl
     import pty
-    import select
     import signal
     import struct
     import termios
 
 
+# 子进程中恢复为默认处理的信号，Python 会忽略 SIGPIPE，忽略状态会被 exec 继承
+RESTORED_SIGNALS = ("SIGPIPE", "SIGXFSZ")
+
+# 本地终端的 TERM 环境变量，与 SSH 通道申请的伪终端类型一致
+DEFAULT_TERM = "xterm-256color"
+
+
 class LocalChannel(PtyChannel):
     """Local 通道"""
 
-    def __init__(self, progname):
+    def __init__(
+        self,
+        progname: str,
+        args: list[str] | None = None,
+        env: dict[str, str] | None = None,
+        cwd: str | None = None,
+    ):
         super().__init__()
         self.progname = progname
+        self.args = args or []
+        # 在当前进程环境变量基础上追加或覆盖的变量
+        self.env = env or {}
+        self.cwd = cwd
+        # 通过 subprocess 启动时的 Popen 对象
+        self.process: subprocess.Popen | None = None
+
+    def build_env(self) -> dict[str, str]:
+        env = dict(os.environ)
+        env["TERM"] = DEFAULT_TERM
+        env.update(self.env)
+        return env
 
     def connect_impl(self):
+        argv = [self.progname, *self.args]
         if sys.platform == "win32":
-            self.proc = PtyProcess.spawn(self.progname)
+            self.proc = PtyProcess.spawn(argv, cwd=self.cwd, env=self.build_env())
             self.proc.fileobj.setblocking(False)
+            self.tx_decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        elif sys.platform == "linux":
+            try:
+                self.pid, self.fd = self.spawn(argv)
+            except NotImplementedError:
+                # 编译时 C 库不支持 POSIX_SPAWN_SETSID
+                self.pid, self.fd = self.spawn_subprocess(argv)
         else:
-            self.pid, self.fd = pty.fork()
-            if self.pid == 0:
-                # 子进程执行目标程序
-                os.execvp(self.progname, [self.progname])
+            self.pid, self.fd = self.fork(argv)
+        if sys.platform != "win32":
+            # 非阻塞读写，pty 缓冲区满时由发送队列稍后重试
+            os.set_blocking(self.fd, False)
+
+    def spawn(self, argv: list[str]) -> tuple[int, int]:
+        """
+        用 posix_spawn 在新的伪终端中启动程序，不复制整个界面进程的地址空间。
+        子进程先 setsid 成为会话首进程，再按路径打开从端，Linux 上由此获得控制终端。
+        """
+        if self.cwd:
+            # posix_spawn 没有切换目录的文件操作，由 shell 切换后再 exec 目标程序
+            argv = ["/bin/sh", "-c", 'cd -- "$0" && exec "$@"', self.cwd, *argv]
+        master, slave = os.openpty()
+        try:
+            slave_path = os.ttyname(slave)
+            file_actions = [
+                (os.POSIX_SPAWN_OPEN, 0, slave_path, os.O_RDWR, 0),
+                (os.POSIX_SPAWN_DUP2, 0, 1),
+                (os.POSIX_SPAWN_DUP2, 0, 2),
+            ]
+            pid = os.posix_spawnp(
+                argv[0],
+                argv,
+                self.build_env(),
+                file_actions=file_actions,
+                setsid=True,
+                setsigdef=[
+                    getattr(signal, name)
+                    for name in RESTORED_SIGNALS
+                    if hasattr(signal, name)
+                ],
+            )
+        except Exception:
+            os.close(master)
+            raise
+        finally:
+            os.close(slave)
+        return pid, master
+
+    def spawn_subprocess(self, argv: list[str]) -> tuple[int, int]:
+        """
+        用 subprocess 启动程序，Linux 上通过 vfork 实现，同样不复制地址空间。
+        子进程在新会话中由 sh 按路径打开从端获得控制终端，再 exec 目标程序。
+        从端同时作为子进程的标准输入输出继承下去，保证 sh 重新打开之前从端一直有进程打开，
+        否则父进程关闭从端后读取主端会立即得到 EIO，被当作连接断开。
+        """
+        master, slave = os.openpty()
+        try:
+            proc = subprocess.Popen(
+                [
+                    "/bin/sh",
+                    "-c",
+                    'exec "$@" <>"$0" >&0 2>&0',
+                    os.ttyname(slave),
+                    *argv,
+                ],
+                stdin=slave,
+                stdout=slave,
+                stderr=slave,
+                env=self.build_env(),
+                cwd=self.cwd,
+                start_new_session=True,
+            )
+        except Exception:
+            os.close(master)
+            raise
+        finally:
+            os.close(slave)
+        # 保留 Popen 对象，由它回收子进程；丢弃后 subprocess 会在后台回收，pid 可能被复用
+        self.process = proc
+        return proc.pid, master
+
+    def fork(self, argv: list[str]) -> tuple[int, int]:
+        """macOS 打开从端不会获得控制终端，仍使用 pty.fork"""
+        env = self.build_env()
+        pid, fd = pty.fork()
+        if pid == 0:
+            # 子进程执行目标程序
+            try:
+                for name in RESTORED_SIGNALS:
+                    if hasattr(signal, name):
+                        signal.signal(getattr(signal, name), signal.SIG_DFL)
+                if self.cwd:
+                    os.chdir(self.cwd)
+                os.execvpe(argv[0], argv, env)
+            finally:
+                os._exit(127)
+        return pid, fd
 
     def disconnect_impl(self):
         if sys.platform == "win32":
             self.proc.close(force=True)
+        elif self.process is not None:
+            # Popen 在子进程已被回收时不会再发送信号
+            self.process.send_signal(signal.SIGHUP)
+            self.process.poll()
+            self.process = None
+            os.close(self.fd)
         else:
             os.kill(self.pid, signal.SIGHUP)
             os.waitpid(self.pid, os.WNOHANG)
             os.close(self.fd)
 
-    def send_impl(self, data: str):
+    def send_impl(self, data: bytes):
         if sys.platform == "win32":
-            self.proc.write(data)
+            # PtyProcess.write 只接受字符串，增量解码避免分块截断多字节字符
+            self.proc.write(self.tx_decoder.decode(data))
+            return len(data)
         else:
-            data_bytes = data.encode()
-            os.write(self.fd, data_bytes)
+            try:
+                return os.write(self.fd, data)
+            except BlockingIOError:
+                return 0
 
     def send_window_size_impl(self, rows: int, cols: int):
         if sys.platform == "win32":
@@ -53,22 +182,28 @@ class LocalChannel(PtyChannel):
             winsize = struct.pack("HHHH", rows, cols, 0, 0)
             fcntl.ioctl(self.fd, termios.TIOCSWINSZ, winsize)
 
-    def recv_non_blocking_impl(self, size: int):
+    def fileno(self):
         if sys.platform == "win32":
+            return self.proc.fileobj.fileno()
+        else:
+            return self.fd
+
+    def recv_into_impl(self, buffer: memoryview):
+        if sys.platform == "win32":
+            # 绕过 PtyProcess.read 的逐块解码，直接读取底层 socket 的原始字节
+            try:
+                size = self.proc.fileobj.recv_into(buffer)
+            except BlockingIOError:
+                return 0
+        else:
             try:
-                data = self.proc.read(size)
-                return data
+                size = os.readv(self.fd, [buffer])
             except BlockingIOError:
-                return ""
-            except EOFError:
+                return 0
+            except OSError:
+                # 子进程退出后读取 pty 主端会抛出 EIO
                 return None
+        if size:
+            return size
         else:
-            r, _, _ = select.select([self.fd], [], [], 0)
-            if r:
-                data = os.read(self.fd, size).decode("utf-8", "replace")
-                if data:
-                    return data
-                else:
-                    return None
-            else:
-                return ""
+            return None
@@ -1,14 +1,44 @@
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from PySide6.QtCore import QObject, Signal
 
+from hterm import metrics
+from hterm.channel.reactor import Reactor
+from hterm.channel.receive_buffer import ReceiveBuffer
+from hterm.channel.reconnect import (
+    RECONNECT_INPUT_LIMIT,
+    STABLE_CONNECTION_TIME,
+    ReconnectPolicy,
+)
+from hterm.channel.send_queue import PasteJob, SendQueue
+
+# 接收缓冲区大小，每个通道复用同一块缓冲区
+RECV_BUFFER_SIZE = 64 * 1024
+
+# 通道暂时不可写时重试的间隔（秒）
+SEND_RETRY_DELAY = 0.005
+# 每次写入调度最多发送的块数，避免大段粘贴长时间占用反应器线程
+SEND_BATCH_CHUNKS = 16
+# 粘贴进度通知的最小间隔（秒）
+SEND_PROGRESS_INTERVAL = 0.1
+
+# 建立连接的线程池，多个会话并发连接且不阻塞界面线程
+CONNECT_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="connect")
+
 
 class PtyChannel(QObject):
     """伪终端通道基类"""
 
-    # 当从远端或本地PTY接收到数据时发射
-    received = Signal(str)
+    # 接收缓冲区由空变为非空时发射，数据通过 read 批量取走
+    data_ready = Signal()
+
+    # 粘贴发送进度 (已发送字节数, 总字节数)，两者相等表示发送结束
+    send_progress = Signal(int, int)
+
+    # 开始建立连接时发射
+    connecting = Signal(str)
 
     # 当连接成功建立时发射
     connected = Signal(str)
@@ -16,10 +46,34 @@ class PtyChannel(QObject):
     # 当连接断开或发生错误时发射
     disconnected = Signal(str)
 
+    # 重连状态变化时发射，携带提示信息
+    reconnecting = Signal(str)
+
     def __init__(self):
         super().__init__()
         self._running = False
         self.is_connected = False
+        self.is_connecting = False
+        self._close_requested = False
+        self._window_size = None
+        self._state_lock = threading.Lock()
+        self._recv_buffer = memoryview(bytearray(RECV_BUFFER_SIZE))
+        self.rx_buffer = ReceiveBuffer()
+        self.rx_buffer.on_drained = self.resume_reading
+        self.tx_queue = SendQueue()
+        self._flush_timer_pending = False
+        self._last_progress_time = 0
+        self._reactor = Reactor.instance()
+        # 接收数据旁路（日志、录制等），在读取数据的线程中以 bytes 调用
+        self.taps: list = []
+        self.reconnect_policy = ReconnectPolicy()
+        self._reconnect_attempt = 0
+        self._reconnect_pending = False
+        self._connected_at = 0.0
+        # 性能统计，会话把它与终端共享；未开启统计时不做任何记录
+        self.metrics = metrics.Metrics()
+        # data_ready 发出的时刻，界面取走数据时据此计算信号排队的延迟
+        self._ready_at = 0.0
 
     def connect_impl(self) -> None:
         """建立通道连接，需要子类实现"""
@@ -29,15 +83,32 @@ class PtyChannel(QObject):
         """断开通道连接，需要子类实现"""
         raise NotImplementedError
 
-    def send_impl(self, data: str) -> None:
-        """向通道发送数据，需要子类实现"""
+    def send_impl(self, data: bytes) -> int:
+        """
+        向通道写入数据，需要子类实现。
+        在反应器线程中调用，不能长时间阻塞，通道暂时不可写时可以只写入一部分。
+        Returns:
+            int: 实际写入的字节数。
+        """
         raise NotImplementedError
 
-    def recv_non_blocking_impl(self, size: int) -> str | None:
+    def fileno(self) -> int | None:
+        """
+        返回可注册到反应器等待读就绪的文件描述符。
+        不支持 select 的通道返回 None，改由独立线程阻塞调用 recv_into_impl。
+        """
+        return None
+
+    def interrupt(self) -> None:
+        """唤醒阻塞在 recv_into_impl 上的独立读取线程，fileno 返回 None 的通道需要实现"""
+        pass
+
+    def recv_into_impl(self, buffer: memoryview) -> int | bytes | None:
         """
-        非阻塞模式从通道读取数据。
+        在通道读就绪后读取原始字节到 buffer 中。
         Returns:
-            str: 成功读取到的数据。如果没有可用数据应返回空字符串 ""。
+            int: 成功读取的字节数。如果没有可用数据应返回 0。
+            bytes: 底层库只能返回新的 bytes 对象时直接返回它，不再复制进 buffer。
         Return:
             None: 明确指示底层通道已关闭/断开，触发回收流程。
         """
@@ -48,49 +119,278 @@ class PtyChannel(QObject):
         pass
 
     def send_window_size(self, rows: int, cols: int) -> None:
+        # 记录窗口大小，连接建立后再同步给远端
+        self._window_size = (rows, cols)
         if self.is_connected:
             self.send_window_size_impl(rows, cols)
 
     def open(self):
+        """在后台线程中建立连接，不阻塞界面"""
+        with self._state_lock:
+            if self.is_connecting or self.is_connected:
+                return
+            self.is_connecting = True
+            self._close_requested = False
+        self.connecting.emit("正在连接...")
+        CONNECT_EXECUTOR.submit(self.connect_in_background)
+
+    def connect_in_background(self):
         try:
             self.connect_impl()
-            # 启动数据接收线程
-            self._running = True
-            self._thread = threading.Thread(target=self.receive_loop, daemon=True)
-            self._thread.start()
-            # 更新状态
-            self.is_connected = True
-            self.connected.emit("连接成功")
+            if self._window_size:
+                self.send_window_size_impl(*self._window_size)
         except Exception as e:
-            # self.disconnect_impl()
-            self.is_connected = False
+            with self._state_lock:
+                self.is_connecting = False
             self.disconnected.emit(f"连接失败：{e}")
+            self._reactor.call_soon(self.schedule_reconnect)
+            return
+
+        with self._state_lock:
+            self.is_connecting = False
+            # 连接过程中会话已被关闭，直接断开
+            if self._close_requested:
+                cancelled = True
+            else:
+                cancelled = False
+                # 更新状态并开始接收数据
+                self._running = True
+                self.is_connected = True
+                self._connected_at = time.monotonic()
+                # 先发出连接成功再开始读取，保证断开和重连信号总在它之后到达
+                self.connected.emit("连接成功")
+                self.start_reading()
+        if cancelled:
+            self.disconnect_impl()
+        else:
+            # 发送重连期间缓存的输入
+            if self.tx_queue:
+                self._reactor.call_soon(self.flush_send_queue)
 
     def close(self):
+        with self._state_lock:
+            self._close_requested = True
         if self.is_connected:
-            # 等待线程结束
+            # 停止接收数据，返回后不会再有读回调执行
             self._running = False
-            self._thread.join()
-            # 断开通道连接
-            self.disconnect_impl()
-            # 更新状态
+            self.stop_reading()
+            self.teardown("已手动断开")
+
+    def schedule_reconnect(self):
+        """连接断开或失败后按重连策略安排下一次连接，在反应器线程中执行"""
+        policy = self.reconnect_policy
+        if self._close_requested or self.is_connected or self.is_connecting:
+            return
+        if not policy.auto:
+            self.tx_queue.clear()
+            self.reconnecting.emit("按回车键重新连接")
+            return
+
+        # 连接稳定运行一段时间后才断开，重新开始退避计数
+        if time.monotonic() - self._connected_at >= STABLE_CONNECTION_TIME:
+            self._reconnect_attempt = 0
+        self._reconnect_attempt += 1
+        if policy.exhausted(self._reconnect_attempt):
+            self._reconnect_attempt = 0
+            self.tx_queue.clear()
+            self.reconnecting.emit("重连次数已用完，按回车键重新连接")
+            return
+
+        delay = policy.delay(self._reconnect_attempt)
+        limit = f"/{policy.max_attempts}" if policy.max_attempts else ""
+        self._reconnect_pending = True
+        self.reconnecting.emit(
+            f"{delay:.1f} 秒后重连（第 {self._reconnect_attempt}{limit} 次）..."
+        )
+        self._reactor.call_later(delay, self._reconnect)
+
+    def _reconnect(self):
+        self._reconnect_pending = False
+        if not self._close_requested:
+            self.open()
+
+    def teardown(self, reason: str):
+        """断开通道连接并通知，远端断开与手动关闭同时发生时只执行一次"""
+        with self._state_lock:
+            if not self.is_connected:
+                return
             self.is_connected = False
-            self.disconnected.emit("已手动断开")
+        self.tx_queue.clear()
+        self.disconnect_impl()
+        self.disconnected.emit(reason)
+
+    def add_tap(self, tap) -> None:
+        """添加接收数据旁路，替换整个列表保证读取线程遍历时线程安全"""
+        self.taps = [*self.taps, tap]
+
+    def remove_tap(self, tap) -> None:
+        self.taps = [t for t in self.taps if t is not tap]
+
+    def read(self, size: int = -1) -> bytes:
+        """从接收缓冲区取走至多 size 字节数据，size 为负数时取走全部"""
+        if metrics.ENABLED:
+            self.metrics.record("channel.pending_bytes", len(self.rx_buffer), "B")
+            if self._ready_at:
+                delay = time.perf_counter() - self._ready_at
+                self.metrics.record_time("channel.signal_delay", delay)
+                self._ready_at = 0.0
+        return self.rx_buffer.take(size)
 
     def send_data(self, data: str):
+        """发送交互输入，优先于尚未开始发送的粘贴内容"""
         if self.is_connected:
-            self.send_impl(data)
-        else:
+            if "\x03" in data:
+                # Ctrl-C 跳过积压的输出并取消粘贴，中断后的提示符不用等旧数据
+                self.rx_buffer.discard()
+                self.tx_queue.cancel_jobs()
+            self.tx_queue.push(data.encode())
+            self._reactor.call_soon(self.flush_send_queue)
+        elif self.is_connecting or self._reconnect_pending:
+            # 正在重连，按策略缓存少量输入，连接成功后发送
+            if (
+                self.reconnect_policy.buffer_input
+                and self.tx_queue.urgent_size + len(data) <= RECONNECT_INPUT_LIMIT
+            ):
+                self.tx_queue.push(data.encode())
+        elif "\r" in data:
+            # 已断开时只有回车键触发重新连接
+            self._reconnect_attempt = 0
             self.open()
 
-    def receive_loop(self):
+    def send_paste(self, data: str, bracketed: bool = False):
+        """分块发送粘贴内容，bracketed 为真时使用括号粘贴模式包裹，未连接时丢弃"""
+        if not self.is_connected:
+            return
+        if bracketed:
+            job = PasteJob(data.encode(), b"\x1b[200~", b"\x1b[201~")
+        else:
+            job = PasteJob(data.encode())
+        self.tx_queue.push_job(job)
+        self._reactor.call_soon(self.flush_send_queue)
+
+    def cancel_paste(self):
+        """取消未发送完的粘贴内容"""
+        self.tx_queue.cancel_jobs()
+        self._reactor.call_soon(self.flush_send_queue)
+
+    def flush_send_queue(self):
+        """在反应器线程中把发送队列写入通道"""
+        if not self.is_connected:
+            return
+        for _ in range(SEND_BATCH_CHUNKS):
+            now = time.monotonic()
+            chunk, wait = self.tx_queue.next_chunk(now)
+            if not chunk:
+                if wait:
+                    self._schedule_flush(wait)
+                return
+            try:
+                size = self.send_impl(chunk)
+            except Exception:
+                # 写入出错由接收端检测断开并回收
+                self.tx_queue.clear()
+                return
+            job = self.tx_queue.advance(size, now)
+            if job is not None:
+                self._report_progress(job, now)
+            if size < len(chunk):
+                # 通道暂时不可写，稍后重试
+                self._schedule_flush(SEND_RETRY_DELAY)
+                return
+        self._reactor.call_soon(self.flush_send_queue)
+
+    def _schedule_flush(self, delay: float):
+        if not self._flush_timer_pending:
+            self._flush_timer_pending = True
+            self._reactor.call_later(delay, self._on_flush_timer)
+
+    def _on_flush_timer(self):
+        self._flush_timer_pending = False
+        self.flush_send_queue()
+
+    def _report_progress(self, job: PasteJob, now: float):
+        if job.done or now - self._last_progress_time >= SEND_PROGRESS_INTERVAL:
+            self._last_progress_time = now
+            self.send_progress.emit(job.total if job.done else job.sent, job.total)
+
+    def start_reading(self):
+        self._fd = self.fileno()
+        self._paused = False
+        if self._fd is None:
+            # 无法 select 的通道使用独立线程阻塞读取
+            self._can_read = threading.Event()
+            self._can_read.set()
+            self._thread = threading.Thread(target=self.read_loop, daemon=True)
+            self._thread.start()
+        else:
+            self._reactor.add_reader(self._fd, self.on_readable)
+
+    def stop_reading(self):
+        if self._fd is not None:
+            self._reactor.remove_reader(self._fd)
+        else:
+            self.interrupt()
+            self._can_read.set()
+            if threading.current_thread() is not self._thread:
+                self._thread.join()
+
+    def pause_reading(self):
+        """接收缓冲区已满，暂停从通道读取数据，反压到发送端"""
+        if metrics.ENABLED:
+            self.metrics.add("channel.paused")
+        if self._fd is not None:
+            self._paused = True
+            self._reactor.remove_reader(self._fd)
+        else:
+            self._can_read.clear()
+            # 清除标志前界面线程可能已经取走了数据
+            if not self.rx_buffer.is_full():
+                self._can_read.set()
+
+    def resume_reading(self):
+        """接收缓冲区有空余空间，恢复读取，由取数据的线程调用"""
+        if self._fd is not None:
+            self._reactor.call_soon(self._resume_reader)
+        else:
+            self._can_read.set()
+
+    def _resume_reader(self):
+        if self._running and self._paused:
+            self._paused = False
+            self._reactor.add_reader(self._fd, self.on_readable)
+
+    def on_readable(self):
+        """通道读就绪回调，在反应器线程或独立读取线程中执行"""
+        if metrics.ENABLED:
+            start = time.perf_counter()
+        size = self.recv_into_impl(self._recv_buffer)
+        if size:
+            # 子类直接返回的 bytes 不经过复用的接收缓冲区
+            data = size if isinstance(size, bytes) else self._recv_buffer[:size]
+            if metrics.ENABLED:
+                # 独立读取线程中还包括阻塞等待数据的时间
+                self.metrics.record_time("channel.read", time.perf_counter() - start)
+                self.metrics.record("channel.read_bytes", len(data), "B")
+            if self.taps:
+                # 旁路需要不可变的数据，只复制一次并共享给所有旁路
+                data = bytes(data)
+                for tap in self.taps:
+                    tap(data)
+            # 只在缓冲区由空变为非空时通知，连续到达的数据合并为一次信号
+            if self.rx_buffer.put(data):
+                if metrics.ENABLED:
+                    self._ready_at = time.perf_counter()
+                self.data_ready.emit()
+            if self.rx_buffer.is_full():
+                self.pause_reading()
+        elif size is None and self._running:
+            self._running = False
+            self.stop_reading()
+            self.teardown("已断开")
+            self._reactor.call_soon(self.schedule_reconnect)
+
+    def read_loop(self):
         while self._running:
-            time.sleep(0.01)
-            data = self.recv_non_blocking_impl(10000)
-            if data:
-                self.received.emit(data)
-            elif data is None:
-                self.disconnect_impl()
-                self._running = False
-                self.is_connected = False
-                self.disconnected.emit("已断开")
+            self._can_read.wait()
+            if self._running:
+                self.on_readable()
@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+
+from PySide6.QtCore import Signal
+
+from hterm.channel.channel_pty import PtyChannel
+
+
+class ReplayChannel(PtyChannel):
+    """
+    录像回放通道，按 asciicast v2 文件中的时间戳把输出事件送入终端。
+
+    speed 为回放倍速，0 表示不等待、尽快回放，可用于测量终端解析和绘制的吞吐量。
+    resize 事件通过 size_changed 信号通知会话按录制时的尺寸调整屏幕，键盘输入会被忽略。
+    """
+
+    # 录像中的终端尺寸变化 (行数, 列数)
+    size_changed = Signal(int, int)
+
+    def __init__(self, path: str, speed: float = 1.0):
+        super().__init__()
+
+        self.path = path
+        self.speed = speed
+        self._stop = threading.Event()
+
+    def connect_impl(self):
+        self.file = open(self.path, encoding="utf-8")
+        header = json.loads(self.file.readline())
+        if header.get("version") != 2:
+            self.file.close()
+            raise ValueError(f"不支持的录像格式：{header.get('version')}")
+        self._pending = b""
+        # 合并输出时读到的尺寸事件，或等待中被打断的事件，留到下次处理
+        self._held = None
+        self._stop.clear()
+        self._start_time = time.monotonic()
+
+    def disconnect_impl(self):
+        self.file.close()
+
+    def send_impl(self, data: bytes):
+        return len(data)
+
+    def interrupt(self):
+        self._stop.set()
+
+    def _next_event(self) -> list | None:
+        """读取下一个输出或尺寸事件，文件结束返回 None"""
+        if self._held is not None:
+            event, self._held = self._held, None
+            return event
+        for line in self.file:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event[1] in ("o", "r"):
+                return event
+        return None
+
+    def _wait_until(self, timestamp: float) -> bool:
+        """等到事件的回放时间，等待期间被关闭返回 False"""
+        if self.speed > 0:
+            delay = self._start_time + timestamp / self.speed - time.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                return False
+        return True
+
+    def recv_into_impl(self, buffer: memoryview):
+        size = len(buffer)
+        while not self._pending:
+            event = self._next_event()
+            if event is None:
+                return None
+            # 等待期间被关闭时直接返回，由读取线程检查运行状态
+            if not self._wait_until(event[0]):
+                self._held = event
+                return 0
+            if event[1] == "r":
+                # 此前的输出都已放入接收缓冲区，会话先解析完它们再调整尺寸
+                cols, rows = event[2].split("x")
+                self.size_changed.emit(int(rows), int(cols))
+            else:
+                self._pending = event[2].encode()
+
+        if self.speed <= 0:
+            # 尽快回放时把后续输出事件合并成整块，减少每次读取的开销，遇到尺寸事件为止
+            parts = [self._pending]
+            length = len(self._pending)
+            while length < size:
+                event = self._next_event()
+                if event is None:
+                    break
+                if event[1] == "r":
+                    self._held = event
+                    break
+                data = event[2].encode()
+                parts.append(data)
+                length += len(data)
+            self._pending = b"".join(parts)
+
+        data = self._pending[:size]
+        self._pending = self._pending[size:]
+        buffer[: len(data)] = data
+        return len(data)
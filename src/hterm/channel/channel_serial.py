@@ -1,38 +1,99 @@
+import sys
+
 import serial
 import serial.tools.list_ports
 
 from hterm.channel.channel_pty import PtyChannel
 
+# 驱动发送缓冲区中允许排队的最大字节数
+SERIAL_TX_WINDOW = 1024
+
+
+# 流控方式
+FLOW_CONTROL_NONE = "none"
+FLOW_CONTROL_RTSCTS = "rtscts"
+FLOW_CONTROL_XONXOFF = "xonxoff"
+
+# Windows 驱动接收缓冲区大小，高波特率下避免驱动层丢数据
+WIN32_RX_BUFFER_SIZE = 1024 * 1024
+
 
 class SerialChannel(PtyChannel):
     """串口通道"""
 
-    def __init__(self, port: str, baud: int):
+    def __init__(
+        self,
+        port: str,
+        baud: int,
+        bytesize: int = serial.EIGHTBITS,
+        parity: str = serial.PARITY_NONE,
+        stopbits: float = serial.STOPBITS_ONE,
+        flow_control: str = FLOW_CONTROL_NONE,
+    ):
         super().__init__()
         self.port = port
         self.baud = baud
+        self.bytesize = bytesize
+        self.parity = parity
+        self.stopbits = stopbits
+        self.flow_control = flow_control
+        # USB 串口的序列号，设备重新枚举后端口名可能变化，据此找回同一设备
+        self.serial_number = None
+
+    def resolve_port(self) -> str:
+        """返回要打开的端口名，原端口消失时按序列号查找重新枚举后的设备"""
+        ports = serial.tools.list_ports.comports()
+        for info in ports:
+            if info.device == self.port:
+                self.serial_number = info.serial_number or self.serial_number
+                return self.port
+        if self.serial_number:
+            for info in ports:
+                if info.serial_number == self.serial_number:
+                    self.port = info.device
+                    return self.port
+        return self.port
 
     def connect_impl(self):
+        # pyserial 在 Linux/macOS 上通过 BOTHER/IOSSIOSPEED 支持任意波特率
         self.ser = serial.Serial(
-            port=self.port,
+            port=self.resolve_port(),
             baudrate=self.baud,
-            bytesize=serial.EIGHTBITS,
-            parity=serial.PARITY_NONE,
-            stopbits=serial.STOPBITS_ONE,
-            timeout=0.01,  # 读取超时设置
+            bytesize=self.bytesize,
+            parity=self.parity,
+            stopbits=self.stopbits,
+            rtscts=self.flow_control == FLOW_CONTROL_RTSCTS,
+            xonxoff=self.flow_control == FLOW_CONTROL_XONXOFF,
+            timeout=None,  # 阻塞读取，有数据到达立即返回
         )
+        if sys.platform == "win32":
+            self.ser.set_buffer_size(rx_size=WIN32_RX_BUFFER_SIZE)
 
     def disconnect_impl(self):
         self.ser.close()
 
-    def send_impl(self, data: str):
-        data_bytes = data.encode()
-        self.ser.write(data_bytes)
+    def send_impl(self, data: bytes):
+        # 只写入驱动发送缓冲区中空余的部分，避免阻塞反应器线程
+        room = SERIAL_TX_WINDOW - self.ser.out_waiting
+        if room <= 0:
+            return 0
+        return self.ser.write(data[:room])
+
+    def fileno(self):
+        if sys.platform == "win32":
+            # Windows 串口没有可 select 的句柄，由独立线程在 recv_into_impl 中阻塞读取
+            return None
+        else:
+            return self.ser.fileno()
+
+    def interrupt(self):
+        self.ser.cancel_read()
 
-    def recv_non_blocking_impl(self, size):
+    def recv_into_impl(self, buffer: memoryview):
         try:
-            data = self.ser.read(1024).decode()
-            return data
+            # 一次性读走缓冲区内已到达的数据，独立线程模式下阻塞等待首个字节
+            size = max(1, min(self.ser.in_waiting, len(buffer)))
+            return self.ser.readinto(buffer[:size])
         except Exception:
             return None
 
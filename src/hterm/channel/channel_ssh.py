@@ -1,49 +1,55 @@
-import paramiko
-
 from hterm.channel.channel_pty import PtyChannel
+from hterm.channel.ssh_pool import SSH_POOL
 
 
 class SshChannel(PtyChannel):
     """SSH通道"""
 
-    def __init__(self, server: str, port: int, username: str, password: str):
+    def __init__(
+        self, server: str, port: int, username: str, password: str, linger: float = 0
+    ):
         super().__init__()
 
         self.server = server
         self.port = port
         self.username = username
         self.password = password
-
-        self.ssh = paramiko.SSHClient()
-        # 允许连接不在 know_hosts 文件中的主机
-        self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        # 最后一个标签页关闭后传输连接保留的秒数
+        self.linger = linger
 
     def connect_impl(self):
-        self.ssh.connect(
+        # 同一主机的标签页共享已认证的传输，只新建会话通道
+        self.transport = SSH_POOL.acquire(
             self.server, self.port, self.username, self.password, timeout=1
         )
-        self.channel = self.ssh.invoke_shell(term="xterm-256color")
-        self.channel.settimeout(0.01)  # 设置 recv 超时时间
-        self.transport = self.ssh.get_transport()
-        self.transport.set_keepalive(10)
+        try:
+            self.channel = self.transport.open_session()
+            self.channel.get_pty(term="xterm-256color")
+            self.channel.invoke_shell()
+        except Exception:
+            SSH_POOL.release(self.server, self.port, self.username)
+            raise
 
     def disconnect_impl(self):
-        self.ssh.close()
+        self.channel.close()
+        SSH_POOL.release(self.server, self.port, self.username, self.linger)
 
-    def send_impl(self, data: str):
-        data_bytes = data.encode()
-        self.channel.send(data_bytes)
+    def send_impl(self, data: bytes):
+        # 发送窗口耗尽时 send 会阻塞，先检查避免卡住反应器线程
+        if not self.channel.send_ready():
+            return 0
+        return self.channel.send(data)
 
     def send_window_size_impl(self, rows: int, cols: int):
         self.channel.resize_pty(width=cols, height=rows)
 
-    def recv_non_blocking_impl(self, size):
+    def fileno(self):
+        return self.channel.fileno()
+
+    def recv_into_impl(self, buffer: memoryview):
         try:
-            data_bytes = self.channel.recv(size)
-            if data_bytes:
-                data_str = data_bytes.decode("utf-8", "replace")
-                return data_str
-            else:
-                return None
+            # paramiko 没有 recv_into，recv 返回的 bytes 直接交给上层，不再复制
+            data_bytes = self.channel.recv(len(buffer))
         except TimeoutError:
-            return ""
+            return 0
+        return data_bytes or None
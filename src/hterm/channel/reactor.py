@@ -0,0 +1,135 @@
+import heapq
+import itertools
+import selectors
+import socket
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future
+
+
+class Reactor:
+    """
+    全局 I/O 反应器。
+
+    在单个专用线程上用 selectors 多路复用所有会话的读就绪事件，
+    各通道只注册读就绪回调，不再各自持有接收线程。
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> Reactor:
+        """获取进程内共享的反应器，首次调用时启动反应器线程"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._callbacks = deque()
+        # 定时回调堆 (到期时间, 序号, 回调, 参数)，只在反应器线程中访问
+        self._timers = []
+        self._timer_seq = itertools.count()
+        # 其他线程通过写入 socketpair 唤醒阻塞在 select 上的反应器线程
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+
+        self._thread = threading.Thread(
+            target=self._run, name="hterm-reactor", daemon=True
+        )
+        self._thread.start()
+
+    def in_reactor_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def call_soon(self, callback, *args) -> None:
+        """在反应器线程中执行回调，可在任意线程调用"""
+        self._callbacks.append((callback, args))
+        self._wakeup()
+
+    def call_later(self, delay: float, callback, *args) -> None:
+        """delay 秒后在反应器线程中执行回调，可在任意线程调用"""
+        when = time.monotonic() + delay
+        if self.in_reactor_thread():
+            self._add_timer(when, callback, args)
+        else:
+            self.call_soon(self._add_timer, when, callback, args)
+
+    def _add_timer(self, when, callback, args):
+        heapq.heappush(self._timers, (when, next(self._timer_seq), callback, args))
+
+    def run(self, callback, *args):
+        """在反应器线程中执行回调并等待其完成，返回回调的返回值"""
+        if self.in_reactor_thread():
+            return callback(*args)
+        future = Future()
+
+        def wrapper():
+            try:
+                future.set_result(callback(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+        self.call_soon(wrapper)
+        return future.result()
+
+    def add_reader(self, fd: int, callback) -> None:
+        """注册读就绪回调，回调在反应器线程中执行"""
+        self.run(self._selector.register, fd, selectors.EVENT_READ, callback)
+
+    def remove_reader(self, fd: int) -> None:
+        """注销读就绪回调，返回后回调不会再被执行"""
+        self.run(self._unregister, fd)
+
+    def _unregister(self, fd: int):
+        try:
+            self._selector.unregister(fd)
+        except KeyError:
+            pass
+
+    def _wakeup(self):
+        try:
+            self._wakeup_w.send(b"\0")
+        except BlockingIOError:
+            # 唤醒缓冲区已满，反应器线程必然会被唤醒
+            pass
+
+    def _run(self):
+        while True:
+            timeout = None
+            if self._timers:
+                timeout = max(0, self._timers[0][0] - time.monotonic())
+            for key, _ in self._selector.select(timeout):
+                if key.data is None:
+                    self._drain_wakeup()
+                # 同一批事件中前面的回调可能已经注销了后面的描述符
+                elif self._selector.get_map().get(key.fd) is key:
+                    self._invoke(key.data)
+            now = time.monotonic()
+            while self._timers and self._timers[0][0] <= now:
+                _, _, callback, args = heapq.heappop(self._timers)
+                self._invoke(callback, *args)
+            while self._callbacks:
+                callback, args = self._callbacks.popleft()
+                self._invoke(callback, *args)
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    @staticmethod
+    def _invoke(callback, *args):
+        # 单个会话的异常不能影响反应器线程
+        try:
+            callback(*args)
+        except Exception:
+            traceback.print_exc()
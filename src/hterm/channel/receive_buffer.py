@@ -0,0 +1,90 @@
+import threading
+import time
+
+# 默认容量，约为界面几帧内可以解析完的数据量
+DEFAULT_CAPACITY = 256 * 1024
+
+
+class ReceiveBuffer:
+    """
+    有界接收缓冲区，通道侧写入，界面线程按帧批量取走。
+
+    缓冲区写满后通道暂停从底层读取数据，借助 SSH 窗口、TCP 或串口流控反压到发送端，
+    界面取走数据腾出空间后通过 on_drained 回调恢复读取。
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._data = bytearray()
+        self._lock = threading.Lock()
+        self._full_since = None
+        # 缓冲区从已满状态腾出空间时的回调，在调用 take 的线程中执行
+        self.on_drained = None
+
+        # 统计指标
+        self.high_water = 0  # 缓冲区数据量的最大值
+        self.throttled_time = 0.0  # 因缓冲区已满而暂停读取的累计时间（秒）
+        self.throttled_count = 0  # 暂停读取的次数
+        self.discarded_bytes = 0  # 被 discard 丢弃的字节数
+
+    def __len__(self):
+        return len(self._data)
+
+    def is_full(self) -> bool:
+        return len(self._data) >= self.capacity
+
+    def put(self, data) -> bool:
+        """写入数据，返回写入前缓冲区是否为空"""
+        with self._lock:
+            was_empty = not self._data
+            self._data += data
+            self.high_water = max(self.high_water, len(self._data))
+            if self._full_since is None and len(self._data) >= self.capacity:
+                self._full_since = time.monotonic()
+                self.throttled_count += 1
+            return was_empty
+
+    def take(self, size: int = -1) -> bytes:
+        """取走至多 size 字节数据，size 为负数时取走全部"""
+        with self._lock:
+            if size < 0 or size >= len(self._data):
+                data = bytes(self._data)
+                self._data.clear()
+            else:
+                data = bytes(self._data[:size])
+                # bytearray 删除头部是 O(1) 的，只移动起始偏移
+                del self._data[:size]
+            drained = self._check_drained()
+        if drained and self.on_drained is not None:
+            self.on_drained()
+        return data
+
+    def discard(self) -> int:
+        """丢弃积压的完整行，保留最后一个换行之后的部分，返回丢弃的字节数"""
+        with self._lock:
+            size = self._data.rfind(b"\n") + 1
+            del self._data[:size]
+            self.discarded_bytes += size
+            drained = self._check_drained()
+        if drained and self.on_drained is not None:
+            self.on_drained()
+        return size
+
+    def _check_drained(self) -> bool:
+        """已满的缓冲区腾出了空间时结束暂停计时并返回 True，需持有锁调用"""
+        if self._full_since is None or len(self._data) >= self.capacity:
+            return False
+        self.throttled_time += time.monotonic() - self._full_since
+        self._full_since = None
+        return True
+
+    def stats(self) -> dict:
+        """返回缓冲区统计指标"""
+        return {
+            "size": len(self._data),
+            "capacity": self.capacity,
+            "high_water": self.high_water,
+            "throttled_time": self.throttled_time,
+            "throttled_count": self.throttled_count,
+            "discarded_bytes": self.discarded_bytes,
+        }
@@ -0,0 +1,57 @@
+import random
+
+# 重连方式
+RECONNECT_MANUAL = "manual"  # 断开后按回车键重新连接
+RECONNECT_AUTO = "auto"  # 断开后按退避间隔自动重连
+
+# 每次重连失败后等待时间的增长倍数
+BACKOFF_FACTOR = 2
+# 随机抖动比例，实际等待时间在 [1 - JITTER, 1] 倍之间，避免大量会话同时重连
+BACKOFF_JITTER = 0.3
+# 连接保持超过此秒数才视为恢复正常，重新从第一次开始计算退避
+STABLE_CONNECTION_TIME = 10.0
+# 重连期间最多缓存的输入字节数，超出的输入被丢弃
+RECONNECT_INPUT_LIMIT = 4096
+
+
+class ReconnectPolicy:
+    """断线重连策略"""
+
+    def __init__(
+        self,
+        mode: str = RECONNECT_MANUAL,
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+        max_attempts: int = 0,
+        buffer_input: bool = True,
+    ):
+        self.mode = mode
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts  # 0 表示不限次数
+        self.buffer_input = buffer_input  # 重连期间缓存输入，连接后发送；否则丢弃
+
+    @classmethod
+    def from_config(cls, config: dict, default_mode: str = RECONNECT_MANUAL):
+        return cls(
+            config.get("mode", default_mode),
+            config.get("initial_delay", 1.0),
+            config.get("max_delay", 30.0),
+            config.get("max_attempts", 0),
+            config.get("buffer_input", True),
+        )
+
+    @property
+    def auto(self) -> bool:
+        return self.mode == RECONNECT_AUTO
+
+    def exhausted(self, attempt: int) -> bool:
+        """第 attempt 次重连是否超出最大次数"""
+        return self.max_attempts > 0 and attempt > self.max_attempts
+
+    def delay(self, attempt: int) -> float:
+        """第 attempt 次重连前等待的秒数，指数增长并加入随机抖动"""
+        delay = min(
+            self.max_delay, self.initial_delay * BACKOFF_FACTOR ** (attempt - 1)
+        )
+        return delay * random.uniform(1 - BACKOFF_JITTER, 1)
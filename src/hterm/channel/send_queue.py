@@ -0,0 +1,132 @@
+import threading
+from collections import deque
+
+# 默认粘贴分块大小
+DEFAULT_CHUNK_SIZE = 4096
+
+
+class PasteJob:
+    """一次粘贴任务，按块发送，可以中途取消"""
+
+    def __init__(self, data: bytes, prefix: bytes = b"", suffix: bytes = b""):
+        # 前后缀（如括号粘贴标记）与正文拼在一起，取消时跳过剩余正文但仍发送后缀
+        self.buffer = prefix + data + suffix
+        self.data_start = len(prefix)
+        self.data_end = len(prefix) + len(data)
+        self.total = len(data)
+        self.offset = 0
+        self.cancelled = False
+
+    @property
+    def sent(self) -> int:
+        """已发送的正文字节数"""
+        return min(max(self.offset - self.data_start, 0), self.total)
+
+    @property
+    def done(self) -> bool:
+        return self.offset >= len(self.buffer)
+
+
+class SendQueue:
+    """
+    通道发送队列，由反应器线程取出数据写入通道。
+
+    交互输入优先于尚未开始的粘贴内容发送，已开始的粘贴发完才轮到交互输入，
+    以免按键落在括号粘贴标记之间；粘贴内容按 chunk_size 分块，
+    块之间可以等待 chunk_delay 秒，每行之后可以等待 line_delay 秒，以适应慢速串口。
+    """
+
+    def __init__(self):
+        self.chunk_size = DEFAULT_CHUNK_SIZE
+        self.chunk_delay = 0.0
+        self.line_delay = 0.0
+
+        self._lock = threading.Lock()
+        self._urgent = bytearray()
+        self._jobs: deque[PasteJob] = deque()
+        # 本块从哪里取出，写入完成后据此推进
+        self._current: PasteJob | None = None
+        # 粘贴内容在此时间之前不发送，实现分块和分行节奏
+        self.resume_at = 0.0
+
+    def __bool__(self):
+        return bool(self._urgent or self._jobs)
+
+    @property
+    def urgent_size(self) -> int:
+        """排队中的交互输入字节数"""
+        return len(self._urgent)
+
+    def push(self, data: bytes):
+        """加入交互输入，插队到尚未开始发送的粘贴内容之前"""
+        with self._lock:
+            self._urgent += data
+
+    def push_job(self, job: PasteJob):
+        with self._lock:
+            self._jobs.append(job)
+
+    def cancel_jobs(self):
+        """取消所有未发送完的粘贴任务"""
+        with self._lock:
+            for job in self._jobs:
+                job.cancelled = True
+
+    def clear(self):
+        with self._lock:
+            self._urgent.clear()
+            self._jobs.clear()
+
+    def next_chunk(self, now: float) -> tuple[bytes, float]:
+        """
+        取出下一块待发送数据。
+        Returns:
+            (数据, 0): 有数据可以立即发送。
+            (b"", 等待秒数): 粘贴内容需要等待节奏间隔。
+            (b"", 0): 队列已空。
+        """
+        with self._lock:
+            while self._jobs:
+                job = self._jobs[0]
+                if job.cancelled:
+                    # 未开始的任务整个跳过，已开始的跳过剩余正文但仍发送后缀
+                    if job.offset == 0:
+                        job.offset = len(job.buffer)
+                    elif job.offset < job.data_end:
+                        job.offset = job.data_end
+                if not job.done:
+                    break
+                self._jobs.popleft()
+            job = self._jobs[0] if self._jobs else None
+            if self._urgent and (job is None or job.offset == 0):
+                self._current = None
+                return bytes(self._urgent), 0
+            if job is not None:
+                if now < self.resume_at:
+                    return b"", self.resume_at - now
+                self._current = job
+                end = min(job.offset + self.chunk_size, len(job.buffer))
+                if self.line_delay > 0:
+                    # 按行发送时，块在行尾截断
+                    for sep in (b"\r", b"\n"):
+                        index = job.buffer.find(sep, job.offset, end)
+                        if index >= 0:
+                            end = index + 1
+                return job.buffer[job.offset : end], 0
+            return b"", 0
+
+    def advance(self, size: int, now: float) -> PasteJob | None:
+        """标记上一块中 size 字节已写入，返回对应的粘贴任务"""
+        with self._lock:
+            job = self._current
+            if job is None:
+                del self._urgent[:size]
+                return None
+            if size:
+                last = job.buffer[job.offset + size - 1 : job.offset + size]
+                job.offset += size
+                if self.line_delay > 0 and last in (b"\r", b"\n"):
+                    self.resume_at = now + self.line_delay
+                elif self.chunk_delay > 0:
+                    self.resume_at = now + self.chunk_delay
+            return job
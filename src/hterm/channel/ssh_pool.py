@@ -0,0 +1,87 @@
+import threading
+
+import paramiko
+
+
+class _PoolEntry:
+    def __init__(self):
+        self.client: paramiko.SSHClient | None = None
+        self.refs = 0
+        self.linger_timer: threading.Timer | None = None
+        # 同一主机的并发连接请求串行执行，后来者直接复用
+        self.connect_lock = threading.Lock()
+
+
+class TransportPool:
+    """
+    进程内共享的已认证 SSH 传输连接池。
+
+    以 (server, port, username) 为键，打开到同一主机的新标签页时只需在已有传输上
+    新建一个会话通道，省去 TCP 建连、密钥交换和认证。引用计数归零后关闭传输，
+    可选地延迟 linger 秒再关闭，以便短时间内重新打开的标签页继续复用。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[tuple, _PoolEntry] = {}
+
+    def acquire(
+        self, server: str, port: int, username: str, password: str, timeout=None
+    ) -> paramiko.Transport:
+        """获取到目标主机的已认证传输，不存在或已失效时新建连接"""
+        key = (server, port, username)
+        with self._lock:
+            entry = self._entries.setdefault(key, _PoolEntry())
+            entry.refs += 1
+            if entry.linger_timer is not None:
+                entry.linger_timer.cancel()
+                entry.linger_timer = None
+
+        try:
+            with entry.connect_lock:
+                transport = entry.client and entry.client.get_transport()
+                if transport is None or not transport.is_active():
+                    client = paramiko.SSHClient()
+                    # 允许连接不在 know_hosts 文件中的主机
+                    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+                    client.connect(server, port, username, password, timeout=timeout)
+                    transport = client.get_transport()
+                    transport.set_keepalive(10)
+                    entry.client = client
+                return transport
+        except Exception:
+            self.release(server, port, username)
+            raise
+
+    def release(self, server: str, port: int, username: str, linger: float = 0):
+        """释放一次引用，最后一个引用释放后关闭传输"""
+        key = (server, port, username)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            if linger > 0:
+                entry.linger_timer = threading.Timer(
+                    linger, self._expire, args=(key, entry)
+                )
+                entry.linger_timer.daemon = True
+                entry.linger_timer.start()
+                return
+            del self._entries[key]
+        if entry.client is not None:
+            entry.client.close()
+
+    def _expire(self, key: tuple, entry: _PoolEntry):
+        with self._lock:
+            if entry.refs > 0 or self._entries.get(key) is not entry:
+                return
+            del self._entries[key]
+        if entry.client is not None:
+            entry.client.close()
+
+
+# 进程内共享的 SSH 传输连接池
+SSH_POOL = TransportPool()
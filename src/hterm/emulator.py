@@ -0,0 +1,135 @@
+import codecs
+
+import pyte
+
+from hterm.scrollback import CompactHistory
+
+# 括号粘贴模式 (DECSET 2004)
+BRACKETED_PASTE_MODE = 2004
+
+# 滚动历史保存的行数
+HISTORY_LINES = 10000
+
+
+class TerminalScreen(pyte.Screen):
+    """在行上标记写满后自动换行的位置，改变宽度后据此重排滚动历史"""
+
+    drawing = False
+
+    def draw(self, data: str):
+        self.drawing = True
+        try:
+            super().draw(data)
+        finally:
+            self.drawing = False
+
+    def carriage_return(self):
+        # 只有 draw 中光标越过最后一列时的回车才是自动换行
+        if self.drawing and self.cursor.x >= self.columns:
+            self.buffer[self.cursor.y].wrapped = True
+        super().carriage_return()
+
+    def unwrap(self, top: int, bottom: int):
+        for y in range(top, bottom):
+            if y in self.buffer:
+                self.buffer[y].wrapped = False
+
+    def erase_in_line(self, how=0, *args, **kwargs):
+        super().erase_in_line(how, *args, **kwargs)
+        # 行尾被擦除后不再与下一行相连
+        if how in (0, 2):
+            self.unwrap(self.cursor.y, self.cursor.y + 1)
+
+    def erase_in_display(self, how=0, *args, **kwargs):
+        super().erase_in_display(how, *args, **kwargs)
+        if how == 0:
+            self.unwrap(self.cursor.y, self.lines)
+        elif how == 1:
+            self.unwrap(0, self.cursor.y)
+        else:
+            self.unwrap(0, self.lines)
+
+
+class Emulator:
+    """
+    终端仿真核心，不依赖 Qt。
+
+    负责解码和解析数据、维护屏幕和滚动历史、改变大小，
+    界面上的 Terminal 和无界面的 HeadlessSession 都只是在它之上读取状态。
+    """
+
+    def __init__(
+        self, columns: int = 80, lines: int = 30, history: int = HISTORY_LINES
+    ):
+        self.screen = TerminalScreen(columns, lines, history)
+        # 用紧凑存储替换 pyte 以字典保存每个单元格的历史行
+        self.history = CompactHistory(history)
+        self.screen.top_buffer = self.history
+        self.stream = pyte.Stream(self.screen)
+        # 有状态的增量解码器，跨多次读取被截断的多字节字符可以正确拼接
+        self.decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+    @property
+    def columns(self) -> int:
+        return self.screen.columns
+
+    @property
+    def lines(self) -> int:
+        return self.screen.lines
+
+    @property
+    def cursor(self) -> tuple[int, int]:
+        return self.screen.cursor.x, self.screen.cursor.y
+
+    @property
+    def total_lines(self) -> int:
+        """到目前为止进入历史的总行数，可作为 text 的 since 参数"""
+        return self.history.offset + len(self.history)
+
+    @property
+    def bracketed_paste(self) -> bool:
+        """远端是否开启了括号粘贴模式"""
+        # 私有模式在 pyte 中左移 5 位存储
+        return (BRACKETED_PASTE_MODE << 5) in self.screen.mode
+
+    def set_history(self, history: CompactHistory):
+        """替换滚动历史的存储，例如换成溢出到磁盘的 DiskHistory，已有的历史行一并转移"""
+        history.extend(self.history)
+        self.history = history
+        self.screen.top_buffer = history
+
+    def feed(self, data: bytes | str):
+        """解析数据更新屏幕状态，通道的原始字节在此统一解码"""
+        if isinstance(data, bytes):
+            data = self.decoder.decode(data)
+        self.stream.feed(data)
+
+    def resize(self, lines: int, columns: int):
+        self.screen.resize(lines, columns)
+
+    def display(self) -> list[str]:
+        """屏幕上每一行的纯文本，去掉行尾空白，光标所在行保留到光标处 (例如提示符后的空格)"""
+        screen = self.screen
+        columns = range(screen.columns)
+        rows = []
+        for y in range(screen.lines):
+            chars = map(screen.buffer[y].__getitem__, columns)
+            row = "".join([char.data for char in chars])
+            stripped = row.rstrip()
+            if y == screen.cursor.y and len(stripped) < screen.cursor.x:
+                stripped = row[: screen.cursor.x]
+            rows.append(stripped)
+        return rows
+
+    def text(self, since: int = 0) -> str:
+        """
+        从绝对行号 since 开始的历史行和屏幕行的纯文本，已被淘汰的行跳过。
+        历史行的绝对行号为 history.offset 加历史中的下标，屏幕第 y 行为 total_lines + y，
+        屏幕行滚入历史后行号不变。
+        """
+        history = self.history
+        start = max(since - history.offset, 0)
+        lines = [history.text(i).rstrip() for i in range(start, len(history))]
+        lines.extend(self.display()[max(since - self.total_lines, 0) :])
+        # 去掉屏幕底部的空行，正则表达式的 $ 可以匹配最后输出的一行
+        return "\n".join(lines).rstrip("\n")
@@ -0,0 +1,432 @@
+import argparse
+import json
+import pathlib
+import re
+import sys
+import time
+from collections.abc import Callable
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QObject, QTimer, Signal
+
+from hterm.channel import LocalChannel, ReplayChannel, SerialChannel, SshChannel
+from hterm.channel.channel_pty import CONNECT_EXECUTOR
+from hterm.channel.reconnect import RECONNECT_AUTO, RECONNECT_MANUAL, ReconnectPolicy
+from hterm.config import Config
+from hterm.emulator import HISTORY_LINES, Emulator
+from hterm.scrollback import DiskHistory
+from hterm.session_log import SessionLogger
+from hterm.session_record import SessionRecorder
+
+# 命令行退出码
+EXIT_OK = 0
+EXIT_TIMEOUT = 1  # --expect 超时或连接在匹配前断开
+EXIT_ERROR = 2  # 配置错误或连接失败
+
+# expect 增量查找时重新查找的已查找历史行数，跨越的行数不超过它的匹配不会遗漏
+EXPECT_OVERLAP_LINES = 16
+
+
+def create_channel(config: dict):
+    """
+    根据配置字典创建并返回相应的 Channel 实例。
+    """
+    channel_type = config.get("type")
+
+    if channel_type == "local":
+        progname = config.get("progname")
+        return LocalChannel(
+            progname,
+            config.get("args"),
+            config.get("env"),
+            config.get("cwd"),
+        )
+
+    elif channel_type == "serial":
+        port = config.get("port")
+        baudrate = config.get("baudrate")
+        if not port:
+            raise ValueError("Serial configuration requires a 'port'.")
+        return SerialChannel(
+            port,
+            baudrate,
+            config.get("bytesize", 8),
+            config.get("parity", "N"),
+            config.get("stopbits", 1),
+            config.get("flow_control", "none"),
+        )
+
+    elif channel_type == "ssh":
+        return SshChannel(
+            config.get("server"),
+            config.get("port"),
+            config.get("username"),
+            config.get("password"),
+            config.get("linger", 0),
+        )
+
+    elif channel_type == "replay":
+        path = config.get("path")
+        if not path:
+            raise ValueError("Replay configuration requires a 'path'.")
+        return ReplayChannel(path, config.get("speed", 1.0))
+
+    else:
+        raise ValueError(f"Unknown channel type: {channel_type}")
+
+
+def create_logger(config: dict) -> SessionLogger | None:
+    """
+    根据会话配置中的 log 表创建会话日志，未配置时返回 None。
+    """
+    log_config = config.get("log")
+    if not log_config or not log_config.get("enabled", True):
+        return None
+
+    name = config.get("name") or config.get("type", "session")
+    default_path = pathlib.Path(Config.get_dir()) / "logs" / "{name}.log"
+    path = str(log_config.get("path", default_path)).format(name=name)
+    return SessionLogger(
+        path,
+        mode=log_config.get("mode", "text"),
+        max_size=log_config.get("max_size", 0),
+        rotate_interval=log_config.get("rotate_interval", 0),
+        compress=log_config.get("compress", True),
+    )
+
+
+def create_recorder(config: dict, cols: int, rows: int) -> SessionRecorder | None:
+    """
+    根据会话配置中的 record 表创建会话录像，未配置时返回 None。
+    """
+    record_config = config.get("record")
+    if not record_config or not record_config.get("enabled", True):
+        return None
+
+    name = config.get("name") or config.get("type", "session")
+    default_path = pathlib.Path(Config.get_dir()) / "recordings" / "{name}-{time}.cast"
+    path = str(record_config.get("path", default_path)).format(
+        name=name, time=time.strftime("%Y%m%d-%H%M%S")
+    )
+    return SessionRecorder(path, cols, rows)
+
+
+def create_scrollback(config: dict) -> DiskHistory | None:
+    """
+    根据会话配置中的 scrollback 表创建不限行数的磁盘滚动历史，未配置时返回 None。
+    """
+    scrollback_config = config.get("scrollback")
+    if not scrollback_config or not scrollback_config.get("enabled", True):
+        return None
+
+    name = config.get("name") or config.get("type", "session")
+    default_path = pathlib.Path(Config.get_dir()) / "scrollback" / "{name}-{time}"
+    path = str(scrollback_config.get("path", default_path)).format(
+        name=name, time=time.strftime("%Y%m%d-%H%M%S")
+    )
+    return DiskHistory(path, scrollback_config.get("memory_lines", HISTORY_LINES))
+
+
+def configure_channel(channel, config: dict):
+    """
+    按会话配置设置通道的接收缓冲、粘贴节奏和重连策略。
+    """
+    channel.rx_buffer.capacity = config.get(
+        "receive_buffer_size", channel.rx_buffer.capacity
+    )
+
+    # 粘贴分块和节奏，慢速串口需要按块或按行限速
+    tx_queue = channel.tx_queue
+    tx_queue.chunk_size = config.get("paste_chunk_size", tx_queue.chunk_size)
+    tx_queue.chunk_delay = config.get("paste_chunk_delay", 0) / 1000
+    tx_queue.line_delay = config.get("paste_line_delay", 0) / 1000
+
+    # 串口默认自动重连，开发板复位后 USB 串口重新枚举时自动接回
+    if config.get("type") == "serial":
+        default_mode = RECONNECT_AUTO
+    else:
+        default_mode = RECONNECT_MANUAL
+    channel.reconnect_policy = ReconnectPolicy.from_config(
+        config.get("reconnect", {}), default_mode
+    )
+
+
+class HeadlessSession(QObject):
+    """
+    无界面会话。
+
+    与 Session 使用同样的配置创建通道、日志、录像和滚动历史，接收的数据直接交给 Emulator 解析。
+    只依赖 QtCore，在 QCoreApplication 的事件循环中运行，不需要显示器。
+    """
+
+    # 收到并解析了一批数据，参数为原始字节
+    output = Signal(bytes)
+    # 连接建立或断开
+    state_changed = Signal()
+
+    def __init__(self, config: dict, columns: int = 80, lines: int = 30, parent=None):
+        super().__init__(parent)
+        self.emulator = Emulator(columns, lines)
+        self.channel = create_channel(config)
+        self.channel.setParent(self)
+        configure_channel(self.channel, config)
+
+        self.scrollback = create_scrollback(config)
+        self.keep_scrollback = config.get("scrollback", {}).get("keep", False)
+        if self.scrollback:
+            self.emulator.set_history(self.scrollback)
+        self.logger = create_logger(config)
+        if self.logger:
+            self.channel.add_tap(self.logger.write)
+        self.recorder = create_recorder(config, columns, lines)
+        if self.recorder:
+            self.channel.add_tap(self.recorder.write)
+
+        # 最近一次连接状态的提示信息
+        self.message = ""
+        self.received_bytes = 0
+        # 下一次 expect 开始匹配的位置 (绝对行号, 列)，之前的输出视为已消费
+        self.expect_position = (0, 0)
+
+        self.channel.data_ready.connect(self.drain)
+        self.channel.connected.connect(self.on_connected)
+        self.channel.disconnected.connect(self.on_disconnected)
+        if isinstance(self.channel, ReplayChannel):
+            self.channel.size_changed.connect(self.apply_replay_size)
+        self.channel.send_window_size(lines, columns)
+
+    @property
+    def is_connected(self) -> bool:
+        # 以通道的状态为准，连接成功的信号可能晚于立即断开的信号到达
+        return self.channel.is_connected
+
+    @property
+    def finished(self) -> bool:
+        """连接已断开，并且断开前收到的数据都已解析"""
+        return not self.channel.is_connected and not len(self.channel.rx_buffer)
+
+    def open(self):
+        self.channel.open()
+
+    def close(self):
+        """关闭通道并释放会话持有的资源"""
+        self.channel.close()
+        if self.logger:
+            self.channel.remove_tap(self.logger.write)
+            self.logger.close()
+        if self.recorder:
+            self.channel.remove_tap(self.recorder.write)
+            self.recorder.close()
+        if self.scrollback:
+            self.scrollback.close(self.keep_scrollback)
+
+    def drain(self):
+        data = self.channel.read()
+        if data:
+            self.emulator.feed(data)
+            self.received_bytes += len(data)
+            self.output.emit(data)
+
+    def on_connected(self, message: str):
+        self.message = message
+        self.state_changed.emit()
+
+    def on_disconnected(self, message: str):
+        # 先解析缓冲区中尚未取走的数据
+        self.drain()
+        self.message = message
+        self.state_changed.emit()
+
+    def send(self, text: str):
+        self.channel.send_data(text)
+
+    def resize(self, lines: int, columns: int):
+        self.emulator.resize(lines, columns)
+        self.channel.send_window_size(lines, columns)
+        if self.recorder:
+            self.recorder.resize(lines, columns)
+
+    def apply_replay_size(self, lines: int, columns: int):
+        """按录像中的尺寸调整屏幕，先解析尺寸变化之前的输出"""
+        self.drain()
+        self.emulator.resize(lines, columns)
+
+    def wait_until(self, predicate: Callable[[], bool], timeout: float) -> bool:
+        """运行事件循环，直到收到数据或连接状态变化后 predicate 返回真，或者超时"""
+        if predicate():
+            return True
+        loop = QEventLoop()
+        timer = QTimer()
+        timer.setSingleShot(True)
+        timer.timeout.connect(loop.quit)
+        timer.start(round(timeout * 1000))
+
+        def check(*args):
+            if predicate():
+                loop.quit()
+
+        self.output.connect(check)
+        self.state_changed.connect(check)
+        loop.exec()
+        self.output.disconnect(check)
+        self.state_changed.disconnect(check)
+        return predicate()
+
+    def wait_connected(self, timeout: float) -> bool:
+        """等待连接建立，连接失败或超时返回 False"""
+        self.wait_until(lambda: self.is_connected or bool(self.message), timeout)
+        return self.is_connected
+
+    def expect(self, pattern: str | re.Pattern, timeout: float) -> re.Match | None:
+        """
+        等待屏幕和滚动历史的纯文本中出现匹配，超时或连接断开返回 None。
+        匹配只从上次匹配结束的位置之后查找，同一段输出不会被重复匹配。
+        等待期间已查找过的历史行不再变化，每次只查找新滚入历史的行和屏幕。
+        """
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        found = None
+        # 已查找过的绝对行号上限，之前的历史行内容不会再变
+        scanned = 0
+
+        def check() -> bool:
+            nonlocal found, scanned
+            if found:
+                return True
+            line, column = self.expect_position
+            if line < self.emulator.history.offset:
+                # 起点所在的行已被淘汰
+                line, column = self.emulator.history.offset, 0
+            if scanned - EXPECT_OVERLAP_LINES > line:
+                line, column = scanned - EXPECT_OVERLAP_LINES, 0
+            text = self.emulator.text(line)
+            found = pattern.search(text, column)
+            scanned = self.emulator.total_lines
+            if found:
+                consumed = text[: found.end()]
+                self.expect_position = (
+                    line + consumed.count("\n"),
+                    found.end() - consumed.rfind("\n") - 1,
+                )
+                return True
+            return self.finished
+
+        self.wait_until(check, timeout)
+        return found
+
+    def run(self, seconds: float):
+        """继续接收 seconds 秒，连接断开时提前返回"""
+        self.wait_until(lambda: self.finished, seconds)
+
+
+def load_session_config(name: str) -> dict:
+    """按名称查找已保存的会话配置"""
+    for config in Config("session").load().get("session", []):
+        if config.get("name") == name:
+            return config
+    raise ValueError(f"找不到会话：{name}")
+
+
+def unescape(text: str) -> str:
+    """解析命令行参数中的 \\r \\n \\x03 等转义，保留其他非 ASCII 字符"""
+    return text.encode("latin-1", "backslashreplace").decode("unicode_escape")
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="hterm --headless",
+        description="无界面运行会话，用于自动化、日志采集和吞吐测试",
+    )
+    parser.add_argument("session", nargs="?", help="已保存的会话名称")
+    parser.add_argument(
+        "--config", help='JSON 格式的会话配置，例如 {"type": "local", "progname": "sh"}'
+    )
+    parser.add_argument("--size", default="80x30", help="终端大小，列x行，默认 80x30")
+    parser.add_argument(
+        "--send",
+        dest="steps",
+        action="append",
+        type=lambda value: ("send", unescape(value)),
+        help="发送文本，支持 \\r \\n \\x03 等转义，可重复",
+    )
+    parser.add_argument(
+        "--expect",
+        dest="steps",
+        action="append",
+        type=lambda value: ("expect", value),
+        help="等待输出匹配正则表达式，与 --send 按出现顺序执行，可重复",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=10.0, help="连接和每个 --expect 的超时秒数"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=0, help="所有步骤完成后继续接收的秒数"
+    )
+    parser.add_argument(
+        "--quiet", action="store_true", help="不把接收的数据写到标准输出"
+    )
+    parser.add_argument(
+        "--print-screen", action="store_true", help="结束时打印屏幕的纯文本"
+    )
+    args = parser.parse_args(argv)
+    if not args.session and not args.config:
+        parser.error("需要指定会话名称或 --config")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    app = QCoreApplication.instance() or QCoreApplication([sys.argv[0]])
+
+    try:
+        if args.config:
+            config = json.loads(args.config)
+        else:
+            config = load_session_config(args.session)
+        columns, lines = (int(n) for n in args.size.lower().split("x"))
+        session = HeadlessSession(config, columns, lines)
+    except (ValueError, OSError) as e:
+        print(f"hterm: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    if not args.quiet:
+
+        def write(data: bytes):
+            sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
+
+        session.output.connect(write)
+
+    start = time.monotonic()
+    session.open()
+    code = EXIT_OK
+    if not session.wait_connected(args.timeout):
+        print(f"hterm: {session.message or '连接超时'}", file=sys.stderr)
+        code = EXIT_ERROR
+    else:
+        for action, value in args.steps or []:
+            if action == "send":
+                session.send(value)
+            elif not session.expect(value, args.timeout):
+                print(f"hterm: 等待 {value!r} 超时", file=sys.stderr)
+                code = EXIT_TIMEOUT
+                break
+        if code == EXIT_OK and args.duration:
+            session.run(args.duration)
+
+    elapsed = time.monotonic() - start
+    if args.print_screen:
+        print("\n".join(session.emulator.display()).rstrip())
+    print(
+        f"hterm: received {session.received_bytes} bytes in {elapsed:.2f} s "
+        f"({session.received_bytes / elapsed / 1024 / 1024:.2f} MB/s)",
+        file=sys.stderr,
+    )
+    session.close()
+    # 等待后台连接线程退出，避免会话销毁后仍向它发射信号
+    CONNECT_EXECUTOR.shutdown(wait=True)
+    app.processEvents()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
+import json
 import pathlib
 import sys
+import time
 
 from PySide6.QtCore import (
     QLibraryInfo,
@@ -7,14 +9,58 @@ from PySide6.QtCore import (
     QTimer,
     QTranslator,
 )
-from PySide6.QtGui import QFontDatabase, QIcon
-from PySide6.QtWidgets import QApplication, QMessageBox
+from PySide6.QtGui import QCloseEvent, QFontDatabase, QIcon
+from PySide6.QtWidgets import QApplication, QFileDialog, QMessageBox
 
+from hterm import headless
 from hterm.config import Config
+from hterm.metrics import Metrics
 from hterm.session import Session
 from hterm.ui import MainWindow
 from hterm.utils import run_python_script_string
 
+# 状态栏性能统计的刷新间隔（毫秒）
+METRICS_INTERVAL = 1000
+
+
+def metrics_text(metrics: Metrics, received_rate: float) -> str:
+    """状态栏上当前会话的统计读数，received_rate 为最近一段时间的接收速率 (B/s)"""
+    parts = [f"接收 {received_rate / 1024 / 1024:.2f} MB/s"]
+    read = metrics.histogram("channel.read_bytes")
+    if read and read.count:
+        parts[0] += f" {read.total / read.count / 1024:.1f} KB/次"
+    parse = metrics.histogram("terminal.parse")
+    if parse and parse.total:
+        parsed = metrics.counters.get("terminal.parse_bytes", 0)
+        rate = parsed / (parse.total / 1000000) / 1024 / 1024
+        parts.append(f"解析 {rate:.2f} MB/s")
+    for name, label in (("terminal.frame", "帧"), ("terminal.paint", "绘制")):
+        histogram = metrics.histogram(name)
+        if histogram and histogram.count:
+            parts.append(
+                f"{label} p50 {histogram.percentile(0.5) / 1000:.1f} ms "
+                f"p99 {histogram.percentile(0.99) / 1000:.1f} ms"
+            )
+    delay = metrics.histogram("channel.signal_delay")
+    pending = metrics.histogram("channel.pending_bytes")
+    if delay and delay.count and pending:
+        parts.append(
+            f"排队 p99 {delay.percentile(0.99) / 1000:.1f} ms "
+            f"积压 p99 {pending.percentile(0.99) / 1024:.0f} KB"
+        )
+    source = metrics.sources.get("receive_buffer")
+    if source:
+        # 接收缓冲区的统计从会话开始累计，不随统计清零
+        stats = source()
+        text = (
+            f"缓冲峰值 {stats['high_water'] / 1024:.0f} KB "
+            f"限流 {stats['throttled_count']} 次 {stats['throttled_time']:.1f} s"
+        )
+        if stats["discarded_bytes"]:
+            text += f" 跳过 {stats['discarded_bytes'] / 1024:.0f} KB"
+        parts.append(text)
+    return " | ".join(parts)
+
 
 class Hterm(MainWindow):
     def __init__(self):
@@ -25,6 +71,15 @@ class Hterm(MainWindow):
         self.quickbar.command_ready.connect(self.send_quick_command)
         self.new_session_action.triggered.connect(self.session_list.new_session)
 
+        # 性能统计读数，上一次采样的 (统计对象, 时间, 已接收字节数) 用于计算速率
+        self.metrics_sample = None
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.update_metrics)
+        self.show_metrics_action.toggled.connect(self.toggle_metrics)
+        self.reset_metrics_action.triggered.connect(self.reset_metrics)
+        self.export_metrics_action.triggered.connect(self.export_metrics)
+        self.tabwidget.currentChanged.connect(self.update_metrics)
+
         load_timer = QTimer(self)
         load_timer.setSingleShot(True)
         load_timer.timeout.connect(self.load)
@@ -58,11 +113,76 @@ class Hterm(MainWindow):
     def close_session(self, index):
         session: Session = self.tabwidget.widget(index)
         self.tabwidget.removeTab(index)
-        session.channel.close()
+        session.release()
         session.deleteLater()
         if self.tabwidget.count() == 0:
             self.terminal_label.clear()
 
+    def closeEvent(self, event: QCloseEvent):
+        """退出前释放所有会话，删除溢出文件，等日志和录制的写入线程写完"""
+        self.metrics_timer.stop()
+        while self.tabwidget.count():
+            self.close_session(0)
+        super().closeEvent(event)
+
+    def toggle_metrics(self, checked: bool):
+        self.metrics_label.setVisible(checked)
+        if checked:
+            self.metrics_timer.start(METRICS_INTERVAL)
+            self.update_metrics()
+        else:
+            self.metrics_timer.stop()
+
+    def update_metrics(self):
+        if not self.metrics_label.isVisible():
+            return
+        session: Session = self.tabwidget.currentWidget()
+        if not session:
+            self.metrics_label.clear()
+            return
+        metrics = session.terminal.metrics
+        read = metrics.histogram("channel.read_bytes")
+        now, received = time.monotonic(), read.total if read else 0
+        rate = 0
+        if self.metrics_sample and self.metrics_sample[0] is metrics:
+            _, last_time, last_received = self.metrics_sample
+            if received >= last_received:
+                rate = (received - last_received) / (now - last_time)
+        self.metrics_sample = (metrics, now, received)
+        self.metrics_label.setText(metrics_text(metrics, rate))
+
+    def reset_metrics(self):
+        """清零所有会话的统计"""
+        for index in range(self.tabwidget.count()):
+            self.tabwidget.widget(index).terminal.metrics.reset()
+        self.metrics_sample = None
+        self.update_metrics()
+
+    def export_metrics(self):
+        """把所有会话的统计导出为 JSON 文件"""
+        default_path = pathlib.Path(Config.get_dir()) / time.strftime(
+            "metrics-%Y%m%d-%H%M%S.json"
+        )
+        path, _ = QFileDialog.getSaveFileName(
+            self, "导出性能统计", str(default_path), "JSON (*.json)"
+        )
+        if not path:
+            return
+        sessions = []
+        for index in range(self.tabwidget.count()):
+            session: Session = self.tabwidget.widget(index)
+            sessions.append(
+                {
+                    "name": self.tabwidget.tabText(index),
+                    **session.terminal.metrics.snapshot(),
+                }
+            )
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"time": time.time(), "sessions": sessions}, f, indent=2)
+        except OSError as e:
+            QMessageBox.critical(self, "导出性能统计出错", str(e))
+
     def send_quick_command(self, config):
         session: Session = self.tabwidget.currentWidget()
         if not session:
@@ -81,6 +201,12 @@ class Hterm(MainWindow):
 
 
 def main():
+    # 无界面模式只需要 QtCore，不创建窗口
+    if "--headless" in sys.argv[1:]:
+        argv = sys.argv[1:]
+        argv.remove("--headless")
+        sys.exit(headless.main(argv))
+
     app = QApplication()
     assets_dir = pathlib.Path(__file__).resolve().parent / "assets"
 
@@ -0,0 +1,170 @@
+import json
+import os
+import time
+from collections.abc import Callable
+from functools import wraps
+
+# 设置环境变量 HTERM_METRICS=1 开启统计；未开启时 timed 原样返回被装饰的函数，
+# 其他埋点只判断这个模块常量，不做任何记录
+ENABLED = os.environ.get("HTERM_METRICS", "") not in ("", "0")
+
+# 直方图把每个 2 的幂区间再等分为 4 个桶，分位数的误差不超过 25%
+SUB_BUCKET_BITS = 2
+# 桶数，足够覆盖到 2^40 (微秒约 12 天，字节 1 TB)，更大的值记入最后一个桶
+HISTOGRAM_BUCKETS = 160
+
+
+def bucket_index(value: int) -> int:
+    """非负整数所在的桶，小于 4 的值各占一个桶"""
+    bits = value.bit_length()
+    if bits <= SUB_BUCKET_BITS:
+        return value
+    shift = bits - SUB_BUCKET_BITS - 1
+    return ((shift + 1) << SUB_BUCKET_BITS) + ((value >> shift) & 3)
+
+
+def bucket_upper(index: int) -> int:
+    """桶中的最大值"""
+    if index < 1 << SUB_BUCKET_BITS:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    return ((((index & 3) | 4) + 1) << shift) - 1
+
+
+class Histogram:
+    """
+    对数分桶的直方图。
+
+    记录只需一次 bit_length 和几次整数运算，可以放在读取线程的热路径上；
+    分位数取所在桶的上界，误差不超过 25%。
+    """
+
+    __slots__ = ("unit", "buckets", "count", "total", "max")
+
+    def __init__(self, unit: str = ""):
+        self.unit = unit
+        self.reset()
+
+    def reset(self):
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        self.buckets[min(bucket_index(value), HISTOGRAM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> int:
+        """估计第 q (0~1) 分位数"""
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(bucket_upper(i), self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "unit": self.unit,
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """
+    一组命名的计数器和直方图，每个会话一组，通道和终端共享。
+
+    计数器和直方图在第一次记录时创建，读取线程和界面线程都会写入，
+    依赖 GIL 保证单次操作的完整性，读取快照时不加锁。
+    """
+
+    def __init__(self):
+        self.counters: dict[str, int] = {}
+        self.histograms: dict[str, Histogram] = {}
+        # 由其他组件自行维护的统计，如接收缓冲区的水位，读取快照时调用取值
+        self.sources: dict[str, Callable[[], dict]] = {}
+        self.started = time.time()
+
+    def watch(self, name: str, source: Callable[[], dict]):
+        """登记一个统计来源，快照中以 name 为键包含 source() 的返回值"""
+        self.sources[name] = source
+
+    def add(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self, name: str, value: int, unit: str = ""):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(unit)
+        histogram.record(value)
+
+    def record_time(self, name: str, seconds: float):
+        """耗时以微秒为单位记录"""
+        self.record(name, int(seconds * 1000000), "us")
+
+    def histogram(self, name: str) -> Histogram | None:
+        return self.histograms.get(name)
+
+    def reset(self):
+        self.counters.clear()
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
+        self.started = time.time()
+
+    def snapshot(self) -> dict:
+        return {
+            "started": self.started,
+            "time": time.time(),
+            "counters": dict(self.counters),
+            "histograms": {
+                name: histogram.snapshot()
+                for name, histogram in list(self.histograms.items())
+            },
+            "sources": {name: source() for name, source in self.sources.items()},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+
+def timed(name: str):
+    """
+    方法装饰器，把每次调用的耗时记录到 self.metrics 中名为 name 的直方图。
+    未开启统计时原样返回被装饰的方法，没有任何额外开销。
+    """
+
+    def decorate(method):
+        if not ENABLED:
+            return method
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.metrics.record_time(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorate
+
+
+if __name__ == "__main__":
+    metrics = Metrics()
+    for size in (512, 4096, 4096, 16384, 65536):
+        metrics.record("channel.read_bytes", size, "B")
+    metrics.record_time("terminal.paint", 0.0042)
+    metrics.add("channel.paused")
+    print(metrics.to_json())
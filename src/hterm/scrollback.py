@@ -0,0 +1,488 @@
+import mmap
+import os
+import struct
+from array import array
+from collections import deque
+
+from pyte.screens import Char, StaticDefaultDict
+
+# 历史行中未写入单元格的默认字符
+DEFAULT_CHAR = Char(" ")
+
+# 溢出到磁盘的行的样式记录头：宽度、样式游程数组长度、标志位
+META_HEADER = struct.Struct("<IIB")
+META_CELLS = 1  # 逐格保存文本
+META_WRAPPED = 2  # 自动换行到下一行
+
+# 按新宽度重排时，一个逻辑行最多向前后查找的物理行数
+MAX_REFLOW_LINES = 1000
+
+
+class StyleTable:
+    """
+    样式表：pyte 的样式元组 (fg, bg, bold, ...) 与整数编号一一对应。
+
+    每个滚动历史一张，随历史一起释放，清空历史时换成新表；
+    压缩行保存所属的表，表被替换后已有的行仍能正确还原。
+    """
+
+    __slots__ = ("ids", "styles")
+
+    def __init__(self):
+        self.ids: dict[tuple, int] = {}
+        self.styles: list[tuple] = []
+
+    def __len__(self):
+        return len(self.styles)
+
+    def __getitem__(self, style_id: int) -> tuple:
+        return self.styles[style_id]
+
+    def intern(self, style: tuple) -> int:
+        style_id = self.ids.get(style)
+        if style_id is None:
+            style_id = self.ids[style] = len(self.styles)
+            self.styles.append(style)
+        return style_id
+
+
+class CompactLine:
+    """
+    紧凑存储的历史行。
+
+    文本拼接为一个字符串，样式按游程编码为 (起始单元格, 样式编号) 数组，编号属于 table，
+    只有宽字符或组合字符使单元格与字符无法一一对应时才逐格保存文本。
+    wrapped 表示这一行是因为写满自动换行的，与下一行属于同一逻辑行。
+    """
+
+    __slots__ = ("text", "cells", "spans", "width", "wrapped", "table", "_key")
+
+    def __init__(self, line: dict, table: StyleTable):
+        width = max(line) + 1 if line else 0
+        data = []
+        spans = array("I")
+        last_style = None
+        for x in range(width):
+            char = line.get(x, DEFAULT_CHAR)
+            data.append(char.data)
+            style = char[1:]
+            if style != last_style:
+                spans.append(x)
+                spans.append(table.intern(style))
+                last_style = style
+        self._pack(data, spans, getattr(line, "wrapped", False), table)
+
+    def _pack(self, data: list[str], spans: array, wrapped: bool, table: StyleTable):
+        text = "".join(data)
+        self.width = len(data)
+        # 每个单元格恰好一个字符时，文本下标即单元格下标
+        if len(text) == len(data) and "" not in data:
+            self.text = text
+            self.cells = None
+        else:
+            self.text = None
+            self.cells = tuple(data)
+        self.spans = spans
+        self.wrapped = wrapped
+        self.table = table
+        self._key = None
+
+    @classmethod
+    def from_cells(
+        cls, data: list[str], styles: list[int], wrapped: bool, table: StyleTable
+    ):
+        """由逐格的文本和 table 中的样式编号创建压缩行"""
+        spans = array("I")
+        last_style = None
+        for x, style_id in enumerate(styles):
+            if style_id != last_style:
+                spans.append(x)
+                spans.append(style_id)
+                last_style = style_id
+        line = cls.__new__(cls)
+        line._pack(data, spans, wrapped, table)
+        return line
+
+    def unpack(self) -> tuple[list[str], list[int]]:
+        """展开为逐格的文本和样式编号"""
+        data = list(self.text if self.cells is None else self.cells)
+        styles = []
+        spans = self.spans
+        for i in range(0, len(spans), 2):
+            end = spans[i + 2] if i + 2 < len(spans) else self.width
+            styles.extend([spans[i + 1]] * (end - spans[i]))
+        return data, styles
+
+    @classmethod
+    def load(cls, text: bytes, meta: bytes, table: StyleTable) -> CompactLine:
+        """从磁盘记录还原压缩行，text 为一行 UTF-8 文本，meta 为 dump 写出的样式记录"""
+        width, count, flags = META_HEADER.unpack_from(meta)
+        line = cls.__new__(cls)
+        line.table = table
+        line.width = width
+        line.wrapped = bool(flags & META_WRAPPED)
+        line.spans = array("I")
+        line.spans.frombytes(meta[META_HEADER.size : META_HEADER.size + count * 4])
+        text = text.decode()
+        if flags & META_CELLS:
+            # 按每个单元格的字符数切分，宽字符占位的空单元格长度为 0
+            sizes = array("I")
+            sizes.frombytes(meta[META_HEADER.size + count * 4 :])
+            cells = []
+            pos = 0
+            for size in sizes:
+                cells.append(text[pos : pos + size])
+                pos += size
+            line.text = None
+            line.cells = tuple(cells)
+        else:
+            line.text = text
+            line.cells = None
+        line._key = None
+        return line
+
+    def dump(self) -> tuple[bytes, bytes]:
+        """序列化为 (一行 UTF-8 文本, 样式记录)，文本部分可以直接作为纯文本阅读"""
+        if self.cells is None:
+            text = self.text
+            cells = b""
+        else:
+            text = "".join(self.cells)
+            # 叠加组合字符的单元格可能超过 255 个字符，长度按 32 位保存
+            cells = array("I", map(len, self.cells)).tobytes()
+        flags = (self.cells is not None) * META_CELLS | self.wrapped * META_WRAPPED
+        meta = META_HEADER.pack(self.width, len(self.spans), flags)
+        return text.encode() + b"\n", meta + self.spans.tobytes() + cells
+
+    @property
+    def plain(self) -> str:
+        """纯文本内容，宽字符的占位单元格不占字符"""
+        return self.text if self.cells is None else "".join(self.cells)
+
+    @property
+    def key(self) -> tuple:
+        """内容和样式的哈希键，用于渲染缓存"""
+        if self._key is None:
+            spans = self.spans.tobytes()
+            self._key = (self.text, self.cells, spans, self.wrapped, self.table)
+        return self._key
+
+    def materialize(self) -> StaticDefaultDict:
+        """还原为 pyte 的行：单元格下标到 Char 的映射"""
+        line = StaticDefaultDict(DEFAULT_CHAR)
+        data = self.text if self.cells is None else self.cells
+        spans = self.spans
+        for i in range(0, len(spans), 2):
+            start = spans[i]
+            end = spans[i + 2] if i + 2 < len(spans) else self.width
+            style = self.table[spans[i + 1]]
+            for x in range(start, end):
+                line[x] = Char(data[x], *style)
+        line.wrapped = self.wrapped
+        return line
+
+
+def reflow(lines: list[CompactLine], columns: int) -> list[CompactLine]:
+    """把自动换行连接的一组物理行合并为逻辑行，再按新的列数重新折行"""
+    table = lines[0].table
+    data: list[str] = []
+    styles: list[int] = []
+    for line in lines:
+        line_data, line_styles = line.unpack()
+        data += line_data
+        styles += line_styles
+    rows = []
+    start = 0
+    while True:
+        end = min(start + columns, len(data))
+        # 宽字符不能跨行，右半边占位单元格落在下一行时整个字符移到下一行
+        if end < len(data) and data[end] == "" and end - 1 > start:
+            end -= 1
+        wrapped = end < len(data)
+        row = CompactLine.from_cells(data[start:end], styles[start:end], wrapped, table)
+        rows.append(row)
+        if end >= len(data):
+            return rows
+        start = end
+
+
+class CompactHistory:
+    """
+    紧凑存储的滚动历史，可替换 pyte 屏幕的 top_buffer。
+
+    提供 deque 的常用接口：append 时把行压缩为 CompactLine，按下标或弹出取出时再还原为 pyte 的行，
+    终端绘制时通过 line 直接取得压缩行，只有滚动到可视范围内的行才会还原。
+    """
+
+    def __init__(self, maxlen: int):
+        self._lines: deque[CompactLine] = deque(maxlen=maxlen)
+        self.styles = StyleTable()
+        # 已从头部淘汰的行数，加上下标即为不随淘汰变化的绝对行号
+        self.offset = 0
+
+    @property
+    def maxlen(self) -> int:
+        return self._lines.maxlen
+
+    @property
+    def spilled(self) -> int:
+        """已溢出到磁盘的行数"""
+        return 0
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __bool__(self):
+        return bool(self._lines)
+
+    def __iter__(self):
+        return (self.line(i).materialize() for i in range(len(self)))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.line(index).materialize()
+
+    def line(self, index: int) -> CompactLine:
+        """取出压缩行，不还原"""
+        return self._lines[index]
+
+    def logical_line(self, index: int) -> tuple[int, int]:
+        """第 index 行所在逻辑行的物理行范围 [start, end)，前后各最多查找 MAX_REFLOW_LINES 行"""
+        start = index
+        while start > 0 and index - start < MAX_REFLOW_LINES:
+            if not self.line(start - 1).wrapped:
+                break
+            start -= 1
+        end = index + 1
+        count = len(self)
+        while end < count and end - index < MAX_REFLOW_LINES:
+            if not self.line(end - 1).wrapped:
+                break
+            end += 1
+        return start, end
+
+    def text(self, index: int) -> str:
+        """取出一行的纯文本，不还原单元格"""
+        return self.line(index).plain
+
+    def append(self, line: dict):
+        if len(self._lines) == self._lines.maxlen:
+            self.offset += 1
+        self._lines.append(CompactLine(line, self.styles))
+
+    def appendleft(self, line: dict):
+        self._lines.appendleft(CompactLine(line, self.styles))
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+    def pop(self) -> StaticDefaultDict:
+        return self._lines.pop().materialize()
+
+    def popleft(self) -> StaticDefaultDict:
+        self.offset += 1
+        return self._lines.popleft().materialize()
+
+    def clear(self):
+        self.offset += len(self)
+        self._lines.clear()
+        self.styles = StyleTable()
+
+
+class AppendLog:
+    """
+    只追加的记录文件，内存中只保存每条记录的起始偏移，读取通过 mmap 进行。
+
+    写入经过文件缓冲，读取的记录超出已映射的范围时才刷新缓冲并重新映射。
+    """
+
+    def __init__(self, path: str, exclusive: bool = False):
+        self.path = path
+        # exclusive 为真时文件已存在则抛出 FileExistsError，不覆盖
+        self._file = open(path, "x+b" if exclusive else "w+b")
+        self._offsets = array("Q")
+        self._size = 0
+        self._map: mmap.mmap | None = None
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def flush(self):
+        self._file.flush()
+
+    def offset(self, index: int) -> int:
+        """第 index 条记录的起始字节，等于记录数时为文件末尾"""
+        return self._offsets[index] if index < len(self._offsets) else self._size
+
+    def append(self, record: bytes):
+        self._offsets.append(self._size)
+        self._file.write(record)
+        self._size += len(record)
+
+    def __getitem__(self, index: int) -> bytes:
+        start = self._offsets[index]
+        end = self._offsets[index + 1] if index + 1 < len(self._offsets) else self._size
+        if self._map is None or end > len(self._map):
+            self._remap()
+        return self._map[start:end]
+
+    def _remap(self):
+        self._unmap()
+        self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _unmap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def truncate(self, count: int):
+        """只保留前 count 条记录"""
+        size = self._offsets[count] if count < len(self._offsets) else self._size
+        del self._offsets[count:]
+        # 截断前先解除映射，避免访问被截掉的页
+        self._unmap()
+        self._file.flush()
+        self._file.truncate(size)
+        self._file.seek(size)
+        self._size = size
+
+    def close(self, delete: bool = True):
+        self._unmap()
+        self._file.close()
+        if delete:
+            os.remove(self.path)
+
+
+class DiskHistory(CompactHistory):
+    """
+    不限行数的滚动历史：内存中保存最近的 maxlen 行，更早的行溢出到磁盘上的只追加文件。
+
+    文件 path.txt 每行一条 UTF-8 文本，path.styles 保存对应的样式游程，
+    滚动到磁盘部分时按行号通过 mmap 读取，内存占用只与可视行数和每行 16 字节的偏移索引有关。
+    样式编号只在本历史的样式表中有效，关闭时选择保留的话只留下纯文本文件。
+    """
+
+    def __init__(self, path: str, maxlen: int):
+        super().__init__(maxlen)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # 同名文件已存在时（如同一秒内打开两个同名标签页）加序号，不与其他历史共用文件
+        base = path
+        index = 1
+        while True:
+            try:
+                self._text = AppendLog(base + ".txt", exclusive=True)
+                break
+            except FileExistsError:
+                base = f"{path}-{index}"
+                index += 1
+        self.text_path = self._text.path
+        self._meta = AppendLog(base + ".styles")
+        # 文件只能追加，从头部弹出的溢出行只跳过不删除，_first 为第一条仍有效的记录
+        self._first = 0
+        # 溢出行之前插入的行，只保存在内存中
+        self._head: deque[CompactLine] = deque()
+
+    @property
+    def maxlen(self) -> None:
+        return None
+
+    @property
+    def spilled(self) -> int:
+        """已溢出到磁盘的行数"""
+        return len(self._text) - self._first
+
+    def spilled_text(self) -> tuple[str, int, int, int]:
+        """
+        刷新溢出的文本并返回 (文件路径, 第一条溢出行的下标, 起始字节, 结束字节)，
+        供后台搜索线程自行读取
+        """
+        self._text.flush()
+        begin = self._text.offset(self._first)
+        return self.text_path, len(self._head), begin, self._text.size
+
+    @property
+    def disk_size(self) -> int:
+        """溢出文件的总字节数"""
+        return self._text.size + self._meta.size
+
+    def __len__(self):
+        return len(self._head) + self.spilled + len(self._lines)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def line(self, index: int) -> CompactLine:
+        if index < 0:
+            index += len(self)
+        if index < len(self._head):
+            return self._head[index]
+        index -= len(self._head)
+        spilled = self.spilled
+        if index < spilled:
+            record = self._first + index
+            text, meta = self._text[record][:-1], self._meta[record]
+            return CompactLine.load(text, meta, self.styles)
+        return self._lines[index - spilled]
+
+    def append(self, line: dict):
+        if len(self._lines) == self._lines.maxlen:
+            text, meta = self._lines.popleft().dump()
+            self._text.append(text)
+            self._meta.append(meta)
+        super().append(line)
+
+    def appendleft(self, line: dict):
+        # 内存窗口前面已经没有别的行并且未满时直接插入窗口，否则放在溢出行之前
+        if self._head or self.spilled or len(self._lines) == self._lines.maxlen:
+            self._head.appendleft(CompactLine(line, self.styles))
+        else:
+            self._lines.appendleft(CompactLine(line, self.styles))
+
+    def pop(self) -> StaticDefaultDict:
+        if self._lines:
+            return self._lines.pop().materialize()
+        if not self.spilled:
+            return self._head.pop().materialize()
+        line = self.line(len(self) - 1)
+        self._text.truncate(len(self._text) - 1)
+        self._meta.truncate(len(self._meta) - 1)
+        return line.materialize()
+
+    def popleft(self) -> StaticDefaultDict:
+        if self._head:
+            line = self._head.popleft()
+        elif self.spilled:
+            line = self.line(0)
+            self._first += 1
+        else:
+            line = self._lines.popleft()
+        self.offset += 1
+        return line.materialize()
+
+    def clear(self):
+        super().clear()
+        self._head.clear()
+        self._first = 0
+        self._text.truncate(0)
+        self._meta.truncate(0)
+
+    def close(self, keep: bool = False):
+        """关闭并删除溢出文件，keep 为真时把内存中的行也写入，保留完整的纯文本文件"""
+        if keep:
+            if self._head or self._first:
+                # 头部有插入或弹出的行时按当前内容重写文本文件
+                lines = [self.line(i).dump()[0] for i in range(len(self))]
+                self._text.truncate(0)
+            else:
+                lines = [line.dump()[0] for line in self._lines]
+            for line in lines:
+                self._text.append(line)
+        self._text.close(delete=not keep)
+        self._meta.close()
@@ -0,0 +1,326 @@
+import bisect
+import queue
+import re
+import threading
+
+from PySide6.QtCore import QObject, Signal
+from pyte.screens import wcwidth
+
+# 后台线程每批匹配的行数，每批之后送回结果并检查查询是否已经改变
+SEARCH_BATCH_LINES = 2000
+
+# 匹配位置：历史行以 (0, 绝对行号, 序号) 表示，屏幕行以 (1, 屏幕行号, 序号) 表示，
+# 元组的自然顺序即从上到下的显示顺序
+HISTORY = 0
+SCREEN = 1
+
+
+def compile_pattern(text: str, regex: bool, case_sensitive: bool) -> re.Pattern:
+    """普通文本按字面匹配，正则表达式有语法错误时抛出 re.error"""
+    flags = 0 if case_sensitive else re.IGNORECASE
+    return re.compile(text if regex else re.escape(text), flags)
+
+
+def find_in_line(pattern: re.Pattern, text: str) -> list[tuple[int, int]]:
+    """一行中所有非空匹配的单元格区间 [start, end)"""
+    spans = [m.span() for m in pattern.finditer(text) if m.end() > m.start()]
+    if not spans or text.isascii():
+        return spans
+    # 宽字符占两个单元格，组合字符不占单元格，按 pyte 的宽度把字符下标换算为列号
+    columns = []
+    x = 0
+    for char in text:
+        columns.append(x)
+        x += max(wcwidth(char), 0)
+    columns.append(x)
+    return [(columns[start], columns[end]) for start, end in spans]
+
+
+class Searcher(QObject):
+    """
+    终端的增量搜索。
+
+    匹配在后台线程中进行：修改查询时提交整个历史和屏幕，之后只提交新进入历史的行和屏幕上变化的行。
+    历史行的文本直接取自压缩行，溢出到磁盘的部分由后台线程直接读文件。
+    结果以单元格区间保存，历史行以绝对行号为键，不受旧行淘汰影响。
+    """
+
+    # 后台线程送回的结果：查询编号、历史匹配 [(行号, 区间列表)]、屏幕匹配 {行号: 区间列表}
+    found = Signal(int, object, object)
+    # 匹配结果或当前匹配改变，参数为当前匹配的序号 (从 1 开始，0 表示未选中) 和匹配总数
+    changed = Signal(int, int)
+
+    def __init__(self, terminal):
+        super().__init__(terminal)
+        self.terminal = terminal
+        self.pattern: re.Pattern | None = None
+        self.generation = 0
+        # 历史匹配：绝对行号 -> 区间列表，以及有匹配的行号的有序列表
+        self.history_matches: dict[int, list[tuple[int, int]]] = {}
+        self.match_lines: list[int] = []
+        # 历史匹配的总数，随合并和淘汰增减，避免每次统计都遍历
+        self.history_count = 0
+        self.screen_matches: dict[int, list[tuple[int, int]]] = {}
+        # 已提交搜索的历史行数 (绝对行号)
+        self.scanned = 0
+        self.current: tuple[int, int, int] | None = None
+
+        self._queue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self.found.connect(self.merge)
+
+    @property
+    def active(self) -> bool:
+        return self.pattern is not None
+
+    def set_query(self, text: str, regex: bool = False, case_sensitive: bool = False):
+        """修改查询并重新搜索，之前未完成的搜索作废；正则表达式有误时抛出 re.error"""
+        self.generation += 1
+        self.pattern = None
+        self.history_matches.clear()
+        self.match_lines.clear()
+        self.history_count = 0
+        self.screen_matches.clear()
+        self.current = None
+        if text:
+            self.pattern = compile_pattern(text, regex, case_sensitive)
+            self.submit_history(full=True)
+            self.submit_screen(range(self.terminal._screen.lines))
+        self.notify()
+
+    def update(self, dirty_rows):
+        """新输出解析后调用，只提交新增的历史行和屏幕上变化的行"""
+        if self.pattern is None:
+            return
+        self.submit_history()
+        self.submit_screen(dirty_rows)
+        # 淘汰出历史的行不再参与导航
+        drop = bisect.bisect_left(self.match_lines, self.terminal.history.offset)
+        if drop:
+            self.drop_lines(0, drop)
+            self.notify()
+
+    def submit_history(self, full: bool = False):
+        history = self.terminal.history
+        total = history.offset + len(history)
+        if total < self.scanned:
+            # 历史行被取回屏幕，作废这些行的结果
+            self.forget_lines(total)
+            self.scanned = total
+        start = history.offset if full else max(self.scanned, history.offset)
+        if full and history.spilled:
+            path, first, begin, size = history.spilled_text()
+            if first:
+                # 插入在溢出行之前的行只在内存中
+                texts = [history.text(i) for i in range(first)]
+                self.submit(("lines", self.generation, self.pattern, start, texts))
+                start += first
+            job = ("disk", self.generation, self.pattern, path, start, begin, size)
+            self.submit(job)
+            start += history.spilled
+        if start < total:
+            offset = history.offset
+            texts = [history.text(no - offset) for no in range(start, total)]
+            self.submit(("lines", self.generation, self.pattern, start, texts))
+        self.scanned = total
+
+    def submit_screen(self, rows):
+        screen = self.terminal._screen
+        columns = range(screen.columns)
+        texts = {}
+        for y in rows:
+            if y < screen.lines:
+                chars = map(screen.buffer[y].__getitem__, columns)
+                texts[y] = "".join([char.data for char in chars])
+        if texts:
+            self.submit(("screen", self.generation, self.pattern, texts))
+
+    def submit(self, job: tuple):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._search_loop, name="terminal-search", daemon=True
+            )
+            self._thread.start()
+        self._queue.put(job)
+
+    def close(self):
+        """作废未完成的搜索并等待后台线程退出，须在关闭滚动历史之前调用"""
+        self.generation += 1
+        self.pattern = None
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _search_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            kind, generation, pattern = job[:3]
+            if generation != self.generation:
+                continue
+            if kind == "screen":
+                texts = job[3]
+                rows = {y: find_in_line(pattern, text) for y, text in texts.items()}
+                self.found.emit(generation, [], rows)
+            elif kind == "lines":
+                self._search_lines(generation, pattern, job[3], job[4])
+            elif kind == "disk":
+                self._search_disk(generation, pattern, *job[3:])
+
+    def _search_lines(self, generation: int, pattern: re.Pattern, start: int, texts):
+        for batch in range(0, len(texts), SEARCH_BATCH_LINES):
+            if generation != self.generation:
+                return
+            results = []
+            for i in range(batch, min(batch + SEARCH_BATCH_LINES, len(texts))):
+                spans = find_in_line(pattern, texts[i])
+                if spans:
+                    results.append((start + i, spans))
+            if results:
+                self.found.emit(generation, results, None)
+
+    def _search_disk(self, generation, pattern: re.Pattern, path, start, begin, size):
+        """
+        按行读取溢出文件 [begin, size) 的字节。
+
+        界面线程弹出历史行时会截断文件，读 mmap 中被截掉的页会触发 SIGBUS，
+        所以用普通的文件读取，被截断时只是提前读到文件末尾。
+        """
+        no = start
+        results = []
+        with open(path, "rb") as file:
+            file.seek(begin)
+            remaining = size - begin
+            while remaining > 0:
+                line = file.readline(remaining)
+                if not line:
+                    break
+                remaining -= len(line)
+                text = line.removesuffix(b"\n").decode(errors="replace")
+                spans = find_in_line(pattern, text)
+                if spans:
+                    results.append((no, spans))
+                no += 1
+                if (no - start) % SEARCH_BATCH_LINES == 0:
+                    if generation != self.generation:
+                        return
+                    if results:
+                        self.found.emit(generation, results, None)
+                        results = []
+        if results:
+            self.found.emit(generation, results, None)
+
+    def merge(self, generation: int, lines: list, rows: dict | None):
+        """在界面线程中合并后台线程送回的结果"""
+        if generation != self.generation:
+            return
+        offset = self.terminal.history.offset
+        for no, spans in lines:
+            if no < offset:
+                # 结果送回前这一行已被淘汰
+                continue
+            old = self.history_matches.get(no)
+            if old is None:
+                if self.match_lines and no < self.match_lines[-1]:
+                    bisect.insort(self.match_lines, no)
+                else:
+                    self.match_lines.append(no)
+            else:
+                self.history_count -= len(old)
+            self.history_matches[no] = spans
+            self.history_count += len(spans)
+        if rows:
+            for y, spans in rows.items():
+                if spans:
+                    self.screen_matches[y] = spans
+                else:
+                    self.screen_matches.pop(y, None)
+        self.notify()
+
+    def forget_lines(self, start: int):
+        """作废绝对行号 start 及之后的历史匹配"""
+        index = bisect.bisect_left(self.match_lines, start)
+        self.drop_lines(index, len(self.match_lines))
+
+    def drop_lines(self, start: int, end: int):
+        """删除 match_lines[start:end] 这些行的匹配"""
+        for no in self.match_lines[start:end]:
+            self.history_count -= len(self.history_matches.pop(no))
+        del self.match_lines[start:end]
+
+    def ordered(self) -> list[tuple[int, int, int]]:
+        """所有匹配按显示顺序排列"""
+        matches = [
+            (HISTORY, no, i)
+            for no in self.match_lines
+            for i in range(len(self.history_matches[no]))
+        ]
+        for y in sorted(self.screen_matches):
+            matches.extend((SCREEN, y, i) for i in range(len(self.screen_matches[y])))
+        return matches
+
+    def notify(self):
+        total = self.history_count + sum(map(len, self.screen_matches.values()))
+        position = 0
+        if self.current is not None:
+            # 只有选中了匹配时才需要排序后的完整列表来计算序号
+            matches = self.ordered()
+            index = bisect.bisect_left(matches, self.current)
+            if index < len(matches) and matches[index] == self.current:
+                position = index + 1
+            else:
+                # 当前匹配所在的行已经变化或被淘汰
+                self.current = None
+        self.changed.emit(position, total)
+        self.terminal.viewport().update()
+
+    def next(self):
+        """选中下一个 (更靠下的) 匹配，到底后回到最上面"""
+        matches = self.ordered()
+        if not matches:
+            return
+        if self.current is None:
+            self.current = matches[0]
+        else:
+            index = bisect.bisect_right(matches, self.current)
+            self.current = matches[index % len(matches)]
+        self.show_current()
+
+    def previous(self):
+        """选中上一个 (更靠上的) 匹配，从底部开始向上查找"""
+        matches = self.ordered()
+        if not matches:
+            return
+        if self.current is None:
+            self.current = matches[-1]
+        else:
+            index = bisect.bisect_left(matches, self.current)
+            self.current = matches[index - 1]
+        self.show_current()
+
+    def show_current(self):
+        kind, no, _ = self.current
+        scrollbar = self.terminal.verticalScrollBar()
+        if kind == HISTORY:
+            # 匹配行滚动到视口中间
+            row = no - self.terminal.history.offset
+            scrollbar.setValue(row - self.terminal._screen.lines // 2)
+        else:
+            scrollbar.setValue(scrollbar.maximum())
+        self.notify()
+
+    def line_spans(self, kind: int, no: int) -> list[tuple[int, int, bool]]:
+        """某一行的匹配区间，第三项表示是否为当前匹配"""
+        if kind == HISTORY:
+            spans = self.history_matches.get(no)
+        else:
+            spans = self.screen_matches.get(no)
+        if not spans:
+            return []
+        current = self.current
+        return [
+            (start, end, current == (kind, no, i))
+            for i, (start, end) in enumerate(spans)
+        ]
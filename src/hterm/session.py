@@ -1,37 +1,30 @@
-from PySide6.QtCore import Signal
-from PySide6.QtWidgets import QApplication, QVBoxLayout, QWidget
-
-from hterm.channel import LocalChannel, SerialChannel, SshChannel
-from hterm.terminal import Terminal
-
-
-def create_channel(config: dict):
-    """
-    根据配置字典创建并返回相应的 Channel 实例。
-    """
-    channel_type = config.get("type")
-
-    if channel_type == "local":
-        progname = config.get("progname")
-        return LocalChannel(progname)
-
-    elif channel_type == "serial":
-        port = config.get("port")
-        baudrate = config.get("baudrate")
-        if not port:
-            raise ValueError("Serial configuration requires a 'port'.")
-        return SerialChannel(port, baudrate)
-
-    elif channel_type == "ssh":
-        return SshChannel(
-            config.get("server"),
-            config.get("port"),
-            config.get("username"),
-            config.get("password"),
-        )
-
-    else:
-        raise ValueError(f"Unknown channel type: {channel_type}")
+import re
+
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QKeySequence, QShortcut
+from PySide6.QtWidgets import (
+    QApplication,
+    QHBoxLayout,
+    QLabel,
+    QProgressBar,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+
+from hterm.channel import ReplayChannel
+from hterm.headless import (
+    configure_channel,
+    create_channel,
+    create_logger,
+    create_recorder,
+    create_scrollback,
+)
+from hterm.terminal import DEFAULT_FPS, Terminal
+from hterm.ui.search_bar import SearchBar
+
+# 粘贴内容超过此大小时显示进度条
+PASTE_PROGRESS_THRESHOLD = 64 * 1024
 
 
 class Session(QWidget):
@@ -43,7 +36,9 @@ class Session(QWidget):
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setContentsMargins(0, 0, 0, 0)
         self.terminal = Terminal(self)
+        self.setup_search_bar()
         self.main_layout.addWidget(self.terminal)
+        self.setup_paste_bar()
         try:
             self.channel = create_channel(config)
             self.channel.setParent(self)
@@ -51,15 +46,129 @@ class Session(QWidget):
             self.terminal.feed(f"Error creating channel: {e}")
             raise
 
+        self.terminal.set_fps(config.get("fps", DEFAULT_FPS))
+        # 超出内存历史的行溢出到磁盘，关闭标签页时删除，除非配置了保留
+        self.scrollback = create_scrollback(config)
+        self.keep_scrollback = config.get("scrollback", {}).get("keep", False)
+        if self.scrollback:
+            self.terminal.set_history(self.scrollback)
+        self.terminal.data_source = self.channel.read
+        self.channel.metrics = self.terminal.metrics
+        self.terminal.metrics.watch("receive_buffer", self.channel.rx_buffer.stats)
+        configure_channel(self.channel, config)
+
+        # 会话日志和录像挂在接收旁路上，由后台线程写盘
+        self.logger = create_logger(config)
+        if self.logger:
+            self.channel.add_tap(self.logger.write)
+        screen = self.terminal._screen
+        self.recorder = create_recorder(config, screen.columns, screen.lines)
+        if self.recorder:
+            self.channel.add_tap(self.recorder.write)
+            self.terminal.resized.connect(self.recorder.resize)
+
         self.terminal.input_ready.connect(self.channel.send_data)
+        self.terminal.paste_ready.connect(self.channel.send_paste)
+        self.channel.send_progress.connect(self.update_paste_progress)
+        self.paste_cancel_button.clicked.connect(self.cancel_paste)
         self.terminal.resized.connect(self.channel.send_window_size)
         self.terminal.resized.connect(lambda cols, rows: self.resized.emit(cols, rows))
-        self.channel.received.connect(self.terminal.feed)
-        # self.channel.connected.connect(lambda s: self.terminal.feed(s))
-        self.channel.disconnected.connect(lambda s: self.terminal.feed(f"\r\n{s}\r\n"))
+        self.channel.data_ready.connect(self.terminal.request_frame)
+        self.channel.connecting.connect(self.show_connecting)
+        self.channel.reconnecting.connect(self.show_connecting)
+        self.channel.connected.connect(self.clear_connecting)
+        self.channel.disconnected.connect(self.show_message)
+        if isinstance(self.channel, ReplayChannel):
+            self.channel.size_changed.connect(self.apply_replay_size)
 
         self.channel.open()
 
+    def release(self):
+        """关闭通道并释放会话持有的资源"""
+        self.channel.close()
+        # 搜索线程可能还在读溢出文件，先等它退出再关闭滚动历史
+        self.terminal.searcher.close()
+        if self.logger:
+            self.channel.remove_tap(self.logger.write)
+            self.logger.close()
+        if self.recorder:
+            self.channel.remove_tap(self.recorder.write)
+            self.recorder.close()
+        if self.scrollback:
+            self.scrollback.close(self.keep_scrollback)
+
+    def apply_replay_size(self, rows: int, cols: int):
+        """按录像中的尺寸调整屏幕，先解析尺寸变化之前的输出"""
+        self.terminal.render_frame()
+        self.terminal.resize_screen(rows, cols)
+
+    def setup_search_bar(self):
+        """终端上方的搜索栏，Ctrl+Shift+F 打开"""
+        self.search_bar = SearchBar(self)
+        self.search_bar.setVisible(False)
+        self.main_layout.addWidget(self.search_bar)
+        shortcut = QShortcut(QKeySequence("Ctrl+Shift+F"), self)
+        shortcut.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+        shortcut.activated.connect(self.search_bar.activate)
+
+        searcher = self.terminal.searcher
+        self.search_bar.query_changed.connect(self.search)
+        self.search_bar.previous_requested.connect(searcher.previous)
+        self.search_bar.next_requested.connect(searcher.next)
+        self.search_bar.closed.connect(self.close_search)
+        searcher.changed.connect(self.search_bar.set_result)
+
+    def search(self, text: str, regex: bool, case_sensitive: bool):
+        try:
+            self.terminal.searcher.set_query(text, regex, case_sensitive)
+        except re.error as e:
+            self.terminal.searcher.set_query("")
+            self.search_bar.set_error(f"正则表达式错误: {e.msg}")
+
+    def close_search(self):
+        """关闭搜索栏并清除高亮"""
+        self.search_bar.setVisible(False)
+        self.terminal.searcher.set_query("")
+        self.terminal.setFocus()
+
+    def setup_paste_bar(self):
+        """大段粘贴的进度条和取消按钮"""
+        self.paste_bar = QWidget(self)
+        layout = QHBoxLayout(self.paste_bar)
+        layout.setContentsMargins(4, 2, 4, 2)
+        self.paste_progress = QProgressBar()
+        self.paste_cancel_button = QPushButton("取消")
+        layout.addWidget(QLabel("正在粘贴"))
+        layout.addWidget(self.paste_progress)
+        layout.addWidget(self.paste_cancel_button)
+        self.paste_bar.setVisible(False)
+        self.main_layout.addWidget(self.paste_bar)
+
+    def update_paste_progress(self, sent: int, total: int):
+        if sent >= total:
+            self.paste_bar.setVisible(False)
+        elif total >= PASTE_PROGRESS_THRESHOLD:
+            self.paste_progress.setMaximum(total)
+            self.paste_progress.setValue(sent)
+            self.paste_bar.setVisible(True)
+
+    def cancel_paste(self):
+        # 取消后剩余正文直接跳过，不一定还会收到发送完成的进度
+        self.paste_bar.setVisible(False)
+        self.channel.cancel_paste()
+
+    def show_connecting(self, message: str):
+        """在当前行显示连接和重连状态，新状态覆盖旧状态，连接成功后清除"""
+        self.terminal.feed(f"\r\x1b[2K\x1b[2m{message}\x1b[0m")
+
+    def clear_connecting(self):
+        self.terminal.feed("\r\x1b[2K")
+
+    def show_message(self, message: str):
+        """在终端中显示提示信息，先显示缓冲区中尚未渲染的数据保证顺序"""
+        self.paste_bar.setVisible(False)
+        self.terminal.feed(self.channel.read() + f"\r\n{message}\r\n".encode())
+
 
 if __name__ == "__main__":
     app = QApplication()
@@ -0,0 +1,172 @@
+import gzip
+import pathlib
+import queue
+import re
+import shutil
+import threading
+import time
+
+# 日志格式
+LOG_MODE_RAW = "raw"  # 原始字节
+LOG_MODE_TEXT = "text"  # 去除控制序列的纯文本
+LOG_MODE_TIMESTAMP = "timestamp"  # 每行带时间戳的纯文本
+
+# 写入线程积压的最大字节数，超过后丢弃新数据，保证不拖慢接收线程
+MAX_PENDING_BYTES = 64 * 1024 * 1024
+# 日志文件写缓冲大小
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# 终端控制序列：CSI、OSC、字符集选择及其他 ESC 序列
+ESCAPE_PATTERN = re.compile(
+    rb"\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[()*+][0-~]"
+    rb"|[ -/]*[0-Z\\^-~])"
+)
+# 删除换行和制表符以外的 C0 控制字符（含回车），bytes.translate 比正则替换快数倍。
+# 直接处理字节，UTF-8 多字节字符的每个字节都不小于 0x80，不会被误删，也不用解码
+CONTROL_BYTES = bytes([*range(0x00, 0x09), *range(0x0B, 0x20), 0x7F])
+# 未结束的控制序列最多保留的长度，超过后丢弃
+MAX_ESCAPE_TAIL = 4096
+
+
+class SessionLogger:
+    """
+    会话日志。
+
+    write 只把数据放进队列，由后台线程批量格式化并写入磁盘，磁盘卡顿不会阻塞接收线程或界面。
+    支持按大小和时间轮转，轮转后的文件在独立线程中 gzip 压缩。
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.Path,
+        mode: str = LOG_MODE_TEXT,
+        max_size: int = 0,
+        rotate_interval: float = 0,
+        compress: bool = True,
+    ):
+        self.path = pathlib.Path(path).expanduser()
+        self.mode = mode
+        self.max_size = max_size  # 单个文件最大字节数，0 表示不按大小轮转
+        self.rotate_interval = rotate_interval  # 轮转间隔秒数，0 表示不按时间轮转
+        self.compress = compress
+
+        self.dropped_bytes = 0
+        self._pending_bytes = 0
+        self._pending_lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        # 被分块截断的控制序列留到下一块一起处理
+        self._tail = b""
+        self._at_line_start = True
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._open_file()
+        self._thread = threading.Thread(
+            target=self._write_loop, name="session-log", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, data: bytes):
+        """记录接收到的数据，可在任意线程调用，不会阻塞"""
+        self._put(data)
+
+    def _put(self, data):
+        with self._pending_lock:
+            if self._pending_bytes > MAX_PENDING_BYTES:
+                self.dropped_bytes += len(data)
+                return
+            self._pending_bytes += len(data)
+        self._queue.put((time.time(), data))
+
+    def close(self):
+        """写完队列中剩余的数据并关闭文件"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _open_file(self):
+        self._file = self.path.open("ab", buffering=WRITE_BUFFER_SIZE)
+        self._size = self._file.tell()
+        self._opened_at = time.time()
+
+    def _write_loop(self):
+        while True:
+            items = [self._queue.get()]
+            # 一次取走所有积压的数据批量处理
+            try:
+                while True:
+                    items.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            for item in items:
+                if item is None:
+                    self._file.close()
+                    return
+                timestamp, data = item
+                with self._pending_lock:
+                    self._pending_bytes -= len(data)
+                self._maybe_rotate(timestamp)
+                out = self._format(timestamp, data)
+                self._file.write(out)
+                self._size += len(out)
+            self._file.flush()
+
+    def _format(self, timestamp: float, data: bytes) -> bytes:
+        if self.mode == LOG_MODE_RAW:
+            return data
+
+        text = self._tail + data if self._tail else bytes(data)
+        # 末尾不完整的控制序列留到下一块
+        index = text.rfind(b"\x1b")
+        if (
+            index >= 0
+            and len(text) - index < MAX_ESCAPE_TAIL
+            and not ESCAPE_PATTERN.match(text, index)
+        ):
+            text, self._tail = text[:index], text[index:]
+        else:
+            self._tail = b""
+        # 控制序列以 ESC 开头，正则可以按字面前缀快速跳过普通文本
+        text = ESCAPE_PATTERN.sub(b"", text).translate(None, CONTROL_BYTES)
+
+        if self.mode == LOG_MODE_TIMESTAMP and text:
+            prefix = time.strftime("[%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+            prefix = f"{prefix}.{int(timestamp * 1000) % 1000:03d}] ".encode()
+            # 以换行结尾时下一块从新行开始，最后的换行后面不加前缀
+            ends_line = text.endswith(b"\n")
+            if ends_line:
+                text = text[:-1].replace(b"\n", b"\n" + prefix) + b"\n"
+            else:
+                text = text.replace(b"\n", b"\n" + prefix)
+            if self._at_line_start:
+                text = prefix + text
+            self._at_line_start = ends_line
+        return text
+
+    def _maybe_rotate(self, timestamp: float):
+        size_due = self.max_size and self._size >= self.max_size
+        time_due = (
+            self.rotate_interval and timestamp - self._opened_at >= self.rotate_interval
+        )
+        if not (size_due or time_due):
+            return
+        self._file.close()
+        suffix = time.strftime("%Y%m%d-%H%M%S", time.localtime(timestamp))
+        rotated = self.path.with_name(f"{self.path.stem}.{suffix}{self.path.suffix}")
+        index = 1
+        while rotated.exists() or rotated.with_name(f"{rotated.name}.gz").exists():
+            name = f"{self.path.stem}.{suffix}-{index}{self.path.suffix}"
+            rotated = self.path.with_name(name)
+            index += 1
+        self.path.rename(rotated)
+        self._open_file()
+        if self.compress:
+            # 压缩较慢，放到独立线程中执行，不耽误后续日志写入
+            threading.Thread(
+                target=self._compress, args=(rotated,), daemon=True
+            ).start()
+
+    @staticmethod
+    def _compress(path: pathlib.Path):
+        with path.open("rb") as src, gzip.open(f"{path}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst, WRITE_BUFFER_SIZE)
+        path.unlink()
@@ -0,0 +1,71 @@
+import codecs
+import json
+import pathlib
+import time
+
+from hterm.session_log import WRITE_BUFFER_SIZE, SessionLogger
+
+# 录像文件格式版本（asciicast v2）
+ASCIICAST_VERSION = 2
+
+
+class SessionRecorder(SessionLogger):
+    """
+    会话录像，保存为 asciicast v2 格式。
+
+    与会话日志共用后台写入线程：接收旁路送来的数据记为输出事件，终端尺寸变化记为 resize 事件，
+    时间戳相对于录制开始时间。
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.Path,
+        cols: int,
+        rows: int,
+        term: str = "xterm-256color",
+    ):
+        self.header = {
+            "version": ASCIICAST_VERSION,
+            "width": cols,
+            "height": rows,
+            "timestamp": int(time.time()),
+            "env": {"TERM": term},
+        }
+        self.start_time = time.time()
+        # 输出事件是 JSON 字符串，跨块截断的多字节字符由增量解码器拼接
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        super().__init__(path, mode="raw")
+
+    def resize(self, rows: int, cols: int):
+        """记录终端尺寸变化，参数顺序与 Terminal.resized 一致"""
+        self._put(f"{cols}x{rows}")
+
+    def _open_file(self):
+        # 每次录制生成独立的文件，文件头只写一次。
+        # 同名文件已存在时（如同一秒内打开两个同名标签页）加序号，不覆盖已有录像
+        path = self.path
+        index = 1
+        while True:
+            try:
+                self._file = path.open("xb", buffering=WRITE_BUFFER_SIZE)
+                break
+            except FileExistsError:
+                path = self.path.with_name(
+                    f"{self.path.stem}-{index}{self.path.suffix}"
+                )
+                index += 1
+        self.path = path
+        self._file.write(json.dumps(self.header).encode() + b"\n")
+        self._size = self._file.tell()
+        self._opened_at = time.time()
+
+    def _format(self, timestamp: float, data) -> bytes:
+        offset = round(timestamp - self.start_time, 6)
+        if isinstance(data, str):
+            event = [offset, "r", data]
+        else:
+            text = self._decoder.decode(data)
+            if not text:
+                return b""
+            event = [offset, "o", text]
+        return json.dumps(event, ensure_ascii=False).encode() + b"\n"
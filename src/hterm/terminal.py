@@ -1,12 +1,30 @@
+import itertools
 import sys
 import time
+from collections import OrderedDict
+from collections.abc import Callable
 from typing import TypedDict
 
-import pyte
-from PySide6.QtCore import Qt, QTimer, Signal
-from PySide6.QtGui import QBrush, QColor, QKeyEvent, QMouseEvent, QPainter, QPalette
+import pyte.graphics
+from PySide6.QtCore import QEvent, QPointF, QRect, QRectF, Qt, QTimer, Signal
+from PySide6.QtGui import (
+    QColor,
+    QFont,
+    QKeyEvent,
+    QMouseEvent,
+    QPainter,
+    QPalette,
+    QRegion,
+    QStaticText,
+    QTransform,
+)
 from PySide6.QtWidgets import QAbstractScrollArea, QApplication
 
+from hterm import metrics
+from hterm.emulator import HISTORY_LINES, Emulator
+from hterm.scrollback import CompactHistory, CompactLine, reflow
+from hterm.search import HISTORY, SCREEN, Searcher
+
 
 class ThemeDict(TypedDict):
     name: str
@@ -39,9 +57,70 @@ DEFAULT_THEME = {
 }
 
 
+# 窗口大小停止变化多久后才通知远端 (毫秒)，拖动窗口时只发送最终大小
+RESIZE_DEBOUNCE = 150
+# 按新宽度重排后的逻辑行最多缓存的数量
+REFLOW_CACHE_SIZE = 256
+
+# 搜索匹配的高亮颜色 (#AARRGGBB)，半透明叠加在背景上
+SEARCH_MATCH_COLOR = "#66FFD54F"
+SEARCH_CURRENT_COLOR = "#CCFF9800"
+
+# 光标和文本闪烁的间隔 (毫秒)
+BLINK_INTERVAL = 500
+
+# 默认渲染帧率
+DEFAULT_FPS = 60
+# 每次从数据来源取出的字节数
+FRAME_CHUNK_BYTES = 16 * 1024
+# 每帧用于解析数据的时间占帧间隔的比例，其余时间留给绘制和输入事件
+FRAME_PARSE_RATIO = 0.5
+
+# 行渲染缓存最多保存的行数，超出后淘汰最久未使用的行
+RENDER_CACHE_SIZE = 2048
+# 颜色查找表中最多缓存的真彩色数量
+TRUECOLOR_CACHE_SIZE = 4096
+
+# pyte 中亮品红的颜色名拼写有误，按正确的名字查找主题颜色
+COLOR_ALIASES = {"bfightmagenta": "brightmagenta"}
+
+
+class TextStyle:
+    """解析好的文本样式，同一样式只创建一次，以整数编号比较"""
+
+    __slots__ = ("id", "fg", "bg", "font", "blink", "decorated")
+
+    def __init__(
+        self, id: int, fg: QColor, bg: QColor, font: QFont, blink: bool, decorated: bool
+    ):
+        self.id = id
+        self.fg = fg
+        self.bg = bg
+        self.font = font
+        self.blink = blink
+        # 有下划线或删除线，空白字符也需要绘制
+        self.decorated = decorated
+
+
+class LineRender:
+    """一行文本预先排版好的绘制数据，内容和样式不变的行直接复用"""
+
+    __slots__ = ("backgrounds", "runs", "blink")
+
+    def __init__(self):
+        # 背景色块 (相对行首的区域, 颜色)
+        self.backgrounds: list[tuple[QRectF, QColor]] = []
+        # 同样式文本段 (相对行首的位置, 排版好的文本, 样式)
+        self.runs: list[tuple[QPointF, QStaticText, TextStyle]] = []
+        # 行内有闪烁文本，闪烁时需要重绘
+        self.blink = False
+
+
 class Terminal(QAbstractScrollArea):
     # 携带用户输入或快捷命令的信号
     input_ready = Signal(str)
+    # 携带粘贴内容的信号，参数为内容和远端是否开启了括号粘贴模式
+    paste_ready = Signal(str, bool)
     # 终端窗口大小改变
     resized = Signal(int, int)
 
@@ -49,8 +128,31 @@ class Terminal(QAbstractScrollArea):
         super().__init__(parent)
 
         self.theme: ThemeDict = DEFAULT_THEME
-        self._screen = pyte.Screen(80, 30, 10000)
-        self.stream = pyte.Stream(self._screen)
+        # 仿真状态都在 Emulator 中，控件只负责输入和绘制
+        self.emulator = Emulator(80, 30, HISTORY_LINES)
+        self._screen = self.emulator.screen
+        # 待显示数据的来源，每帧调用一次批量取走数据
+        self.data_source: Callable[[int], bytes] | None = None
+        # 性能统计，会话中与通道共享
+        self.metrics = metrics.Metrics()
+        # 行渲染缓存，以整行字符（内容和样式）为键
+        self.render_cache: OrderedDict[tuple, LineRender] = OrderedDict()
+        # 重排缓存，以 (列数, 逻辑行各物理行的内容) 为键
+        self.reflow_cache: OrderedDict[tuple, list[CompactLine]] = OrderedDict()
+        # 屏幕第一行在视口中的行号，滚动到历史中时由 visible_lines 更新
+        self.screen_top = 0
+        # 视口每一行显示的内容来源 (类型, 首行行号, 各物理行起始单元格, 本行起始单元格)，
+        # 用于把按行保存的搜索匹配换算到重排后的视口行上
+        self.row_refs: list[tuple[int, int, tuple[int, ...], int]] = []
+        self.searcher = Searcher(self)
+        self.match_color = QColor(SEARCH_MATCH_COLOR)
+        self.current_match_color = QColor(SEARCH_CURRENT_COLOR)
+        # 颜色名、256 色和真彩色到 QColor 的查找表，在 set_theme 中生成
+        self.colors: dict[str, QColor] = {}
+        # pyte 样式元组到解析好的样式的查找表
+        self.styles: dict[tuple, TextStyle] = {}
+        # (加粗, 斜体, 下划线, 删除线) 到预先创建的字体的查找表
+        self.fonts: dict[tuple[bool, bool, bool, bool], QFont] = {}
 
         self.set_theme(self.theme)
         # 2. 字体配置 (必须是等宽字体)
@@ -67,18 +169,133 @@ class Terminal(QAbstractScrollArea):
         self.cursor_visible = True
         self.blink_text_visible = True
         self.last_input_time = 0
+        # 上次重绘时的光标位置，光标移动时只重绘新旧两个单元格
+        self.last_cursor = (0, 0)
+        # 视口中含有闪烁文本的行，绘制时更新，闪烁时只重绘这些行
+        self.blink_rows: set[int] = set()
 
-        # 闪烁计时器 (实现光标和文本闪烁)
+        # 闪烁计时器 (实现光标和文本闪烁)，只在终端获得焦点时运行
         self.blink_timer = QTimer(self)
+        self.blink_timer.setInterval(BLINK_INTERVAL)
         self.blink_timer.timeout.connect(self.toggle_blink_state)
-        self.blink_timer.start(500)
 
-    def feed(self, data: str):
+        # 帧计时器，合并到达的数据按帧解析和绘制
+        self.frame_interval = 1 / DEFAULT_FPS
+        self.last_frame_time = 0
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.frame_timer.timeout.connect(self.render_frame)
+
+        # 大小变化防抖计时器，本地屏幕实时跟随，停止变化后才发出 resized
+        self.emitted_size = None
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(RESIZE_DEBOUNCE)
+        self.resize_timer.timeout.connect(self.emit_resized)
+
+    @property
+    def history(self) -> CompactHistory:
+        return self.emulator.history
+
+    def set_history(self, history: CompactHistory):
+        """替换滚动历史的存储，例如换成溢出到磁盘的 DiskHistory，已有的历史行一并转移"""
+        self.emulator.set_history(history)
+        self.update_scrollbar()
+
+    def set_fps(self, fps: int):
+        """设置渲染帧率上限"""
+        self.frame_interval = 1 / fps
+
+    def request_frame(self):
+        """请求渲染一帧，距上一帧不足一个帧间隔时推迟到下一帧"""
+        if self.frame_timer.isActive():
+            return
+        delay = self.last_frame_time + self.frame_interval - time.monotonic()
+        self.frame_timer.start(max(0, round(delay * 1000)))
+
+    @metrics.timed("terminal.frame")
+    def render_frame(self):
+        """从数据来源批量取走数据，每帧只更新一次滚动条并重绘一次"""
+        self.last_frame_time = time.monotonic()
+        if self.data_source is None:
+            return
+        data = self.data_source(FRAME_CHUNK_BYTES)
+        if not data:
+            return
+        deadline = self.last_frame_time + self.frame_interval * FRAME_PARSE_RATIO
+        while True:
+            self.parse(data)
+            if len(data) < FRAME_CHUNK_BYTES:
+                break
+            # 解析超出本帧预算，剩余数据留到下一帧
+            if time.monotonic() >= deadline:
+                if metrics.ENABLED:
+                    self.metrics.add("terminal.frame_overrun")
+                self.request_frame()
+                break
+            data = self.data_source(FRAME_CHUNK_BYTES)
+        self.update_scrollbar()
+        self.update_dirty()
+
+    @metrics.timed("terminal.parse")
+    def parse(self, data: bytes | str):
+        """解析数据更新屏幕状态"""
+        if metrics.ENABLED:
+            self.metrics.add("terminal.parse_bytes", len(data))
+        self.emulator.feed(data)
+
+    def feed(self, data: bytes | str):
         """向终端喂要显示的数据"""
-        # print("recv:", data.encode())
-        self.stream.feed(data)
+        self.parse(data)
         self.update_scrollbar()
-        self.viewport().update()
+        self.update_dirty()
+
+    def update_dirty(self):
+        """把屏幕脏行和光标移动转换为最小的重绘区域"""
+        screen = self._screen
+        scrollbar = self.verticalScrollBar()
+        cursor = (screen.cursor.x, screen.cursor.y)
+        # 只把新进入历史的行和变化的屏幕行交给搜索
+        if self.searcher.active:
+            self.searcher.update(screen.dirty)
+        if scrollbar.value() != scrollbar.maximum():
+            # 查看历史时屏幕滚动会让视口中的历史行整体移位，直接全部重绘
+            if screen.dirty or cursor != self.last_cursor:
+                self.viewport().update()
+        else:
+            # 视口位于底部时，视口的行与屏幕的行一一对应
+            region = QRegion()
+            width = self.viewport().width()
+            for y in screen.dirty:
+                if y < screen.lines:
+                    region += QRect(0, y * self.line_height, width, self.line_height)
+            if cursor != self.last_cursor:
+                region += self.cell_rect(*self.last_cursor)
+                region += self.cell_rect(*cursor)
+            if not region.isEmpty():
+                self.viewport().update(region)
+        screen.dirty.clear()
+        self.last_cursor = cursor
+
+    def cell_rect(self, x: int, y: int) -> QRect:
+        """单元格在视口中的像素区域，向外扩展一个像素以覆盖空心光标的边框"""
+        rect = QRectF(
+            x * self.char_width, y * self.line_height, self.char_width, self.line_height
+        )
+        return rect.toAlignedRect().adjusted(-1, -1, 1, 1)
+
+    def cursor_rect(self) -> QRect | None:
+        """光标单元格在视口中的像素区域，光标不在可视范围内时返回 None"""
+        screen = self._screen
+        row = self.screen_top + screen.cursor.y
+        if 0 <= row < screen.lines:
+            return self.cell_rect(screen.cursor.x, row)
+        return None
+
+    def row_rect(self, row: int) -> QRect:
+        width = self.viewport().width()
+        return QRect(0, row * self.line_height, width, self.line_height)
 
     def input(self, data: str):
         """终端输入数据"""
@@ -88,8 +305,12 @@ class Terminal(QAbstractScrollArea):
 
     def paste(self):
         clipboard = QApplication.clipboard()
-        text = clipboard.text()
-        self.input(text)
+        # 与 xterm 一致，粘贴内容的换行统一转换为回车
+        text = clipboard.text().replace("\r\n", "\r").replace("\n", "\r")
+        if not text:
+            return
+        self.last_input_time = time.time()
+        self.paste_ready.emit(text, self.emulator.bracketed_paste)
 
     def set_theme(self, theme: ThemeDict):
         self.theme.update(theme)
@@ -99,20 +320,117 @@ class Terminal(QAbstractScrollArea):
         palette.setColor(QPalette.Text, QColor(self.theme["foreground"]))
         self.setPalette(palette)
 
-    def toggle_blink_state(self):
-        if self.hasFocus():
-            self.cursor_visible = not self.cursor_visible
+        # 预先生成颜色查找表，绘制时不再解析颜色字符串
+        self.colors = {color: QColor(f"#{color}") for color in pyte.graphics.FG_BG_256}
+        for name, value in self.theme.items():
+            if name != "name":
+                self.colors[name] = QColor(value)
+        for alias, name in COLOR_ALIASES.items():
+            if name in self.colors:
+                self.colors[alias] = self.colors[name]
+        self.cursor_color = QColor(self.theme["cursor"])
+        self.cursor_color.setAlpha(128)  # 半透明
+        self.invalidate_styles()
+
+    def update_fonts(self):
+        """预先创建各种文本属性组合的字体"""
+        self.fonts = {}
+        for key in itertools.product((False, True), repeat=4):
+            bold, italic, underline, strike_out = key
+            font = QFont(self.font())
+            font.setBold(bold)
+            font.setItalic(italic)
+            font.setUnderline(underline)
+            font.setStrikeOut(strike_out)
+            self.fonts[key] = font
+        self.invalidate_styles()
+
+    def invalidate_styles(self):
+        """主题或字体改变后，已解析的样式和缓存的排版全部失效"""
+        self.styles.clear()
+        self.render_cache.clear()
+        self.viewport().update()
+
+    def color(self, name: str) -> QColor:
+        """查找颜色，查找表中没有的真彩色在首次使用时加入"""
+        color = self.colors.get(name)
+        if color is None:
+            color = QColor(f"#{name}")
+            if len(self.colors) < len(pyte.graphics.FG_BG_256) + TRUECOLOR_CACHE_SIZE:
+                self.colors[name] = color
+        return color
+
+    def style(self, key: tuple) -> TextStyle:
+        """把 pyte 的样式元组解析为样式对象，相同的元组只解析一次"""
+        style = self.styles.get(key)
+        if style is not None:
+            return style
+        fg, bg, bold, italics, underscore, strikethrough, reverse, blink = key
+        # 反转前景色与背景色
+        if reverse:
+            fg_color = self.colors["background"]
+            bg_color = self.colors["foreground"]
         else:
-            # 失焦后光标始终显示
-            self.cursor_visible = True
+            fg_color = self.colors["foreground"]
+            bg_color = self.colors["background"]
+        if fg != "default":
+            fg_color = self.color(fg)
+        if bg != "default":
+            bg_color = self.color(bg)
+        if not self.fonts:
+            self.update_fonts()
+        style = TextStyle(
+            len(self.styles),
+            fg_color,
+            bg_color,
+            self.fonts[(bold, italics, underscore, strikethrough)],
+            blink,
+            underscore or strikethrough,
+        )
+        self.styles[key] = style
+        return style
 
+    def toggle_blink_state(self):
+        """切换光标和闪烁文本的显示状态，只重绘光标单元格和含有闪烁文本的行"""
+        cursor_visible = not self.cursor_visible
         # 连续输入过程保证光标可见
         if time.time() - self.last_input_time < 0.5:
-            self.cursor_visible = True
-
+            cursor_visible = True
         self.blink_text_visible = not self.blink_text_visible
 
-        self.viewport().update()
+        region = QRegion()
+        if cursor_visible != self.cursor_visible:
+            self.cursor_visible = cursor_visible
+            rect = self.cursor_rect()
+            if rect is not None:
+                region += rect
+        for row in self.blink_rows:
+            region += self.row_rect(row)
+        if not region.isEmpty():
+            self.viewport().update(region)
+
+    def update_blink_timer(self):
+        """
+        终端有焦点时才运行闪烁计时器，隐藏的标签页、最小化或失焦的窗口不产生任何定时唤醒。
+        停止时光标和闪烁文本保持显示。
+        """
+        region = QRegion()
+        if self.hasFocus() and self.isVisible() and not self.window().isMinimized():
+            if not self.blink_timer.isActive():
+                self.blink_timer.start()
+        else:
+            self.blink_timer.stop()
+            if not self.blink_text_visible:
+                self.blink_text_visible = True
+                for row in self.blink_rows:
+                    region += self.row_rect(row)
+        # 焦点变化时光标在实心和空心之间切换
+        self.cursor_visible = True
+        rect = self.cursor_rect()
+        if rect is not None:
+            region += rect
+        if not region.isEmpty():
+            self.viewport().update(region)
 
     def update_scrollbar(self):
         if self.verticalScrollBar().value() == self.verticalScrollBar().maximum():
@@ -120,142 +438,226 @@ class Terminal(QAbstractScrollArea):
         else:
             is_bottom = False
 
-        self.verticalScrollBar().setRange(0, len(self._screen.top_buffer))
+        self.verticalScrollBar().setRange(0, len(self.history))
 
         # 滚动条不在底部时，不更新值
         if is_bottom:
             self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
 
+    def visible_lines(self, start: int) -> list:
+        """
+        从第 start 行开始取出一屏的行，历史部分返回压缩行，不还原为单元格。
+
+        宽度改变后，历史中自动换行的逻辑行在这里按当前列数重排，只处理可视范围内的行；
+        滚动条仍按原来的物理行计数。
+        """
+        screen = self._screen
+        columns = screen.columns
+        count = len(self.history)
+        offset = self.history.offset
+        lines = []
+        refs = []
+        i = start
+        while i < count and len(lines) < screen.lines:
+            group_start, group_end = self.history.logical_line(i)
+            group = [self.history.line(j) for j in range(group_start, group_end)]
+            if group[-1].width <= columns and all(
+                line.width == columns for line in group[:-1]
+            ):
+                # 折行宽度与当前列数一致，无需重排
+                lines.extend(group[i - group_start :])
+                refs.extend((HISTORY, offset + j, (0,), 0) for j in range(i, group_end))
+            else:
+                rows = self.reflow(group, columns)
+                # 各物理行在逻辑行中的起始单元格
+                starts = []
+                cell = 0
+                for line in group:
+                    starts.append(cell)
+                    cell += line.width
+                starts = tuple(starts)
+                # 从 start 所在物理行的第一个单元格所在的新行开始显示
+                target = starts[i - group_start]
+                cell = 0
+                for row in rows:
+                    if cell + row.width > target or row is rows[-1]:
+                        lines.append(row)
+                        refs.append((HISTORY, offset + group_start, starts, cell))
+                    cell += row.width
+            i = group_end
+        del lines[screen.lines :]
+        del refs[screen.lines :]
+        self.screen_top = len(lines)
+        for y in range(screen.lines - len(lines)):
+            lines.append(screen.buffer[y])
+            refs.append((SCREEN, y, (0,), 0))
+        self.row_refs = refs
+        return lines
+
+    def reflow(self, group: list[CompactLine], columns: int) -> list[CompactLine]:
+        """按列数重排一个逻辑行，结果缓存"""
+        key = (columns, tuple(line.key for line in group))
+        rows = self.reflow_cache.get(key)
+        if rows is None:
+            rows = reflow(group, columns)
+            self.reflow_cache[key] = rows
+            if len(self.reflow_cache) > REFLOW_CACHE_SIZE:
+                self.reflow_cache.popitem(last=False)
+        else:
+            self.reflow_cache.move_to_end(key)
+        return rows
+
+    def line_render(self, line) -> LineRender:
+        """取出一行的渲染数据，缓存未命中时重新排版"""
+        columns = self._screen.columns
+        if isinstance(line, CompactLine):
+            # 压缩行自带内容哈希，只在缓存未命中时还原
+            key = (columns, line.key)
+        else:
+            key = tuple(map(line.__getitem__, range(columns)))
+        render = self.render_cache.get(key)
+        if render is None:
+            if isinstance(line, CompactLine):
+                line = line.materialize()
+                chars = tuple(map(line.__getitem__, range(columns)))
+            else:
+                chars = key
+            render = self.build_line_render(chars)
+            self.render_cache[key] = render
+            if len(self.render_cache) > RENDER_CACHE_SIZE:
+                self.render_cache.popitem(last=False)
+        else:
+            self.render_cache.move_to_end(key)
+        return render
+
+    def build_line_render(self, chars: tuple) -> LineRender:
+        """把一行字符按样式分段，每段排版成 QStaticText"""
+        render = LineRender()
+        style = self.style
+        default_bg = self.colors["background"]
+        # 合并后的背景色块 [起始单元格, 结束单元格, 颜色]
+        spans = []
+        x = 0
+        # Char 除 data 外的字段即为样式，相邻字符只比较样式编号即可合并
+        styled = [(char.data, style(char[1:])) for char in chars]
+        for _, group in itertools.groupby(styled, key=lambda cell: cell[1].id):
+            cells = list(group)
+            text_style = cells[0][1]
+            data = "".join(cell[0] for cell in cells)
+            # 按单元格计算位置，宽字符的第二个单元格 data 为空
+            left = x * self.char_width
+            start, x = x, x + len(cells)
+
+            # 默认背景已由视口填充，跳过；相邻的同色背景跨样式段合并为一块
+            bg = text_style.bg
+            if bg != default_bg:
+                if spans and spans[-1][1] == start and spans[-1][2] == bg:
+                    spans[-1][1] = x
+                else:
+                    spans.append([start, x, bg])
+
+            # 空白段只需要绘制背景
+            if not data.strip() and not text_style.decorated:
+                continue
+            text = QStaticText(data)
+            text.setTextFormat(Qt.TextFormat.PlainText)
+            text.prepare(QTransform(), text_style.font)
+            render.runs.append((QPointF(left, 0), text, text_style))
+            render.blink = render.blink or text_style.blink
+
+        for start, end, bg in spans:
+            rect = QRectF(
+                start * self.char_width,
+                0,
+                (end - start) * self.char_width,
+                self.line_height,
+            )
+            render.backgrounds.append((rect, bg))
+        return render
+
+    @metrics.timed("terminal.paint")
     def paintEvent(self, event):
         painter = QPainter(self.viewport())
-        painter.setBackgroundMode(Qt.BGMode.OpaqueMode)
-        font = painter.font()
-        color = QColor()
-        brush = QBrush(color)  # 传入 color 保证是 BrushStyle.SolidPattern 类型
 
         # --- 绘制文本 ---
-        text_visible = True
         start_line = self.verticalScrollBar().value()
-        screen_buffer = self._screen.get_screen_buffer(start_line)
-        last_char = None
-        for i, line in enumerate(screen_buffer):
-            y = i * self.line_height
-
-            data = ""
-            for x in range(self._screen.columns):
-                char = line[x]
-
-                # 判断当前字符样式是否与上一个字符完全一致
-                is_same_style = False
-                if last_char is not None:
-                    # 只有所有影响视觉的属性都一致，才能合并字符串
-                    is_same_style = (
-                        char.fg == last_char.fg
-                        and char.bg == last_char.bg
-                        and char.bold == last_char.bold
-                        and char.italics == last_char.italics
-                        and char.underscore == last_char.underscore
-                        and char.strikethrough == last_char.strikethrough
-                        and char.reverse == last_char.reverse
-                        and char.blink == last_char.blink
-                    )
-                last_char = char
-                if is_same_style:
-                    # 遇到相同格式字符
-                    # 1. 将当前字符合并进 data
-                    # 2. 直接遍历下一个字符
-                    data += char.data
-
-                    # 已经遍历到行尾，将 data 渲染出来
-                    if x == self._screen.columns - 1:
-                        if text_visible:
-                            painter.drawText(
-                                (x + 1 - len(data)) * self.char_width,
-                                y + self.fontMetrics().ascent(),
-                                data,
-                            )
+        screen_buffer = self.visible_lines(start_line)
+        # 只绘制重绘区域覆盖的行
+        rect = event.rect()
+        first_row = max(0, rect.top() // self.line_height)
+        last_row = min(len(screen_buffer), rect.bottom() // self.line_height + 1)
+        rows = []
+        for i in range(first_row, last_row):
+            render = self.line_render(screen_buffer[i])
+            rows.append((i * self.line_height, render))
+            if render.blink:
+                self.blink_rows.add(i)
+            else:
+                self.blink_rows.discard(i)
+        # 先绘制所有行的背景，再以透明背景绘制文本，
+        # 避免下一行的背景覆盖上一行超出单元格的字形
+        for y, render in rows:
+            if render.backgrounds:
+                # 缓存的坐标相对行首，平移坐标系后直接绘制
+                painter.resetTransform()
+                painter.translate(0, y)
+                for rect, color in render.backgrounds:
+                    painter.fillRect(rect, color)
+        painter.resetTransform()
+        if self.searcher.active:
+            for i in range(first_row, last_row):
+                self.paint_matches(painter, i)
+        for y, render in rows:
+            painter.resetTransform()
+            painter.translate(0, y)
+            for pos, text, text_style in render.runs:
+                # 字符有闪烁属性且当前闪烁文本不可见时，跳过渲染
+                if text_style.blink and not self.blink_text_visible:
                     continue
-                else:
-                    # 遇到不同格式字符
-                    # 1. 渲染出之前的 data
-                    # 2. 当前字符赋值给 data，作为新格式数据打头阵
-                    # 3. 重新给 painter 设置新格式
-                    if data:
-                        if text_visible:
-                            painter.drawText(
-                                (x - len(data)) * self.char_width,
-                                y + self.fontMetrics().ascent(),
-                                data,
-                            )
-                    data = char.data
-
-                # 文本闪烁
-                if char.blink and not self.blink_text_visible:
-                    # 字符有闪烁属性且当前闪烁文本不可见时，跳过渲染
-                    text_visible = False
-                else:
-                    text_visible = True
-                # 反转前景色与背景色
-                if char.reverse:
-                    bg_color = self.theme["foreground"]
-                    fg_color = self.theme["background"]
-                else:
-                    fg_color = self.theme["foreground"]
-                    bg_color = self.theme["background"]
-                # 前景色
-                if char.fg == "default":
-                    pass
-                elif char.fg in self.theme.keys():
-                    fg_color = self.theme[char.fg]
-                else:
-                    fg_color = "#" + char.fg
-                color.setRgb(int(fg_color[1:], base=16))
-                painter.setPen(color)
-                # 背景色
-                if char.bg == "default":
-                    pass
-                elif char.bg in self.theme.keys():
-                    bg_color = self.theme[char.bg]
-                else:
-                    bg_color = "#" + char.bg
-                color.setRgb(int(bg_color[1:], base=16))
-                brush.setColor(color)
-                painter.setBackground(brush)
-                # 文本属性
-                font.setBold(char.bold)  # 加粗
-                font.setItalic(char.italics)  # 斜体
-                font.setUnderline(char.underscore)  # 下滑线
-                font.setStrikeOut(char.strikethrough)  # 删除线
-                painter.setFont(font)
+                painter.setFont(text_style.font)
+                painter.setPen(text_style.fg)
+                painter.drawStaticText(pos, text)
+        painter.resetTransform()
 
         # --- 绘制光标 ---
-        all_lines = len(self._screen.top_buffer) + self._screen.lines
         # 判断光标在可视范围
-        if (
-            start_line + self._screen.lines
-            > all_lines - self._screen.lines + self._screen.cursor.y
-        ):
-            if self.cursor_visible:
-                # 计算光标像素位置
-                cursor_screen_x = self._screen.cursor.x * self.char_width
-                cursor_screen_y = (
-                    all_lines - self._screen.lines - start_line + self._screen.cursor.y
-                ) * self.line_height
-                # 绘制块状光标
-                cursor_color = QColor(self.theme["cursor"])
-                cursor_color.setAlpha(128)  # 半透明
-                # 判断焦点状态
-                if self.hasFocus():
-                    painter.setPen(Qt.NoPen)
-                    painter.setBrush(cursor_color)
-                else:
-                    painter.setBrush(Qt.NoBrush)  # 空心光标
-                painter.drawRect(
-                    cursor_screen_x,
-                    cursor_screen_y,
-                    self.char_width,
+        cursor_row = self.screen_top + self._screen.cursor.y
+        if cursor_row < self._screen.lines and self.cursor_visible:
+            # 绘制块状光标
+            # 判断焦点状态
+            if self.hasFocus():
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(self.cursor_color)
+            else:
+                painter.setBrush(Qt.NoBrush)  # 空心光标
+            painter.drawRect(
+                self._screen.cursor.x * self.char_width,
+                cursor_row * self.line_height,
+                self.char_width,
+                self.line_height,
+            )
+
+    def paint_matches(self, painter: QPainter, row: int):
+        """在视口第 row 行叠加搜索匹配的高亮"""
+        kind, first, starts, row_start = self.row_refs[row]
+        columns = self._screen.columns
+        y = row * self.line_height
+        for i, start in enumerate(starts):
+            # 匹配区间按物理行保存，换算到重排后这一行的单元格
+            shift = start - row_start
+            for begin, end, current in self.searcher.line_spans(kind, first + i):
+                begin = max(begin + shift, 0)
+                end = min(end + shift, columns)
+                if begin >= end:
+                    continue
+                rect = QRectF(
+                    begin * self.char_width,
+                    y,
+                    (end - begin) * self.char_width,
                     self.line_height,
                 )
+                color = self.current_match_color if current else self.match_color
+                painter.fillRect(rect, color)
 
     def keyPressEvent(self, event: QKeyEvent):
         """处理键盘输入"""
@@ -273,16 +675,54 @@ class Terminal(QAbstractScrollArea):
         if text:
             self.input(text)
 
+    def changeEvent(self, event):
+        """字体改变后重新生成字体变体，缓存的排版失效"""
+        if event.type() == QEvent.Type.FontChange:
+            self.update_fonts()
+        super().changeEvent(event)
+
+    def focusInEvent(self, event):
+        self.update_blink_timer()
+        super().focusInEvent(event)
+
+    def focusOutEvent(self, event):
+        self.update_blink_timer()
+        super().focusOutEvent(event)
+
+    def showEvent(self, event):
+        self.update_blink_timer()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.blink_timer.stop()
+        super().hideEvent(event)
+
     def resizeEvent(self, event):
-        """窗口大小改变时重新计算滚动条"""
+        """
+        窗口大小改变时本地屏幕立即跟随并重新计算滚动条，
+        拖动停止 RESIZE_DEBOUNCE 毫秒后才发出 resized，避免远端反复重绘。
+        """
         rows = int(self.viewport().height() / self.line_height)
         cols = int(self.viewport().width() / self.char_width)
-        self._screen.resize(rows, cols)
-        self.resized.emit(rows, cols)
+        # 渲染缓存以整行内容为键，已包含列数，改变大小后仍然有效
+        self.emulator.resize(rows, cols)
+        self.resize_timer.start()
         self.update_scrollbar()
 
         super().resizeEvent(event)
 
+    def resize_screen(self, rows: int, cols: int):
+        """按指定行列数调整屏幕，不改变窗口大小，也不通知远端"""
+        self._screen.resize(rows, cols)
+        self.update_scrollbar()
+        self.viewport().update()
+
+    def emit_resized(self):
+        size = (self._screen.lines, self._screen.columns)
+        if size != self.emitted_size:
+            self.emitted_size = size
+            self.resized.emit(*size)
+
     def focusNextPrevChild(self, next):
         """禁止 tab 焦点切换"""
         return False
@@ -297,6 +737,7 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     term = Terminal()
     term.input_ready.connect(term.feed)
+    term.paste_ready.connect(lambda text, bracketed: term.feed(text))
     term.resized.connect(lambda row, cols: print(f"window size: ({row}, {cols})"))
     term.resize(600, 400)
     term.show()
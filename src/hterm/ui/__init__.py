@@ -1,11 +1,13 @@
 from .main_window import MainWindow
 from .quick_bar import QuickBar
 from .quick_dialog import QuickDialog
+from .search_bar import SearchBar
 from .session_list import SessionList
 
 __all__ = [
     "MainWindow",
     "QuickBar",
     "QuickDialog",
+    "SearchBar",
     "SessionList",
 ]
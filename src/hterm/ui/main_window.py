@@ -14,6 +14,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from hterm import metrics
 from hterm.config import Config
 from hterm.ui.about_dialog import AboutDialog
 from hterm.ui.quick_bar import QuickBar
@@ -48,6 +49,24 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.tabwidget)
 
     def setup_statusbar(self):
+        # 性能统计读数和菜单，只在开启统计 (HTERM_METRICS=1) 时显示
+        self.metrics_label = QLabel()
+        self.metrics_label.setVisible(False)
+        self.statusBar().addPermanentWidget(self.metrics_label)
+        metrics_button = QToolButton()
+        metrics_button.setIcon(qta.icon("mdi.speedometer"))
+        metrics_button.setToolTip("性能统计")
+        metrics_button.setAutoRaise(True)
+        metrics_button.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+        metrics_menu = QMenu(self)
+        self.show_metrics_action = metrics_menu.addAction("在状态栏显示")
+        self.show_metrics_action.setCheckable(True)
+        self.reset_metrics_action = metrics_menu.addAction("清零")
+        self.export_metrics_action = metrics_menu.addAction("导出为 JSON...")
+        metrics_button.setMenu(metrics_menu)
+        metrics_button.setVisible(metrics.ENABLED)
+        self.statusBar().addPermanentWidget(metrics_button)
+
         self.terminal_label = QLabel()
         self.statusBar().addPermanentWidget(self.terminal_label)
 
@@ -0,0 +1,123 @@
+import qtawesome as qta
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QAction, QKeyEvent
+from PySide6.QtWidgets import (
+    QApplication,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QToolButton,
+    QWidget,
+)
+
+
+class SearchLineEdit(QLineEdit):
+    """回车查找上一个，Shift+回车查找下一个，Esc 关闭"""
+
+    previous_requested = Signal()
+    next_requested = Signal()
+    close_requested = Signal()
+
+    def keyPressEvent(self, event: QKeyEvent):
+        if event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            if event.modifiers() & Qt.ShiftModifier:
+                self.next_requested.emit()
+            else:
+                self.previous_requested.emit()
+        elif event.key() == Qt.Key_Escape:
+            self.close_requested.emit()
+        else:
+            super().keyPressEvent(event)
+
+
+class SearchBar(QWidget):
+    """终端搜索栏"""
+
+    # 查询内容、是否正则表达式、是否区分大小写
+    query_changed = Signal(str, bool, bool)
+    previous_requested = Signal()
+    next_requested = Signal()
+    closed = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(4, 2, 4, 2)
+
+        self.edit = SearchLineEdit()
+        self.edit.setPlaceholderText("查找")
+        self.edit.addAction(qta.icon("mdi.magnify"), QLineEdit.LeadingPosition)
+        self.regex_action = QAction(qta.icon("mdi.regex"), "正则表达式", self)
+        self.regex_action.setCheckable(True)
+        self.case_action = QAction(
+            qta.icon("mdi.format-letter-case"), "区分大小写", self
+        )
+        self.case_action.setCheckable(True)
+        self.edit.addAction(self.case_action, QLineEdit.TrailingPosition)
+        self.edit.addAction(self.regex_action, QLineEdit.TrailingPosition)
+        layout.addWidget(self.edit)
+
+        self.result_label = QLabel("无结果")
+        layout.addWidget(self.result_label)
+
+        buttons = (
+            ("mdi.chevron-up", "上一个 (回车)", self.previous_requested),
+            ("mdi.chevron-down", "下一个 (Shift+回车)", self.next_requested),
+            ("mdi.close", "关闭 (Esc)", self.closed),
+        )
+        for icon, tip, signal in buttons:
+            button = QToolButton()
+            button.setIcon(qta.icon(icon))
+            button.setToolTip(tip)
+            button.setAutoRaise(True)
+            button.setFocusPolicy(Qt.NoFocus)
+            button.clicked.connect(signal)
+            layout.addWidget(button)
+
+        self.edit.textChanged.connect(self.emit_query)
+        self.regex_action.toggled.connect(self.emit_query)
+        self.case_action.toggled.connect(self.emit_query)
+        self.edit.previous_requested.connect(self.previous_requested)
+        self.edit.next_requested.connect(self.next_requested)
+        self.edit.close_requested.connect(self.closed)
+
+    def emit_query(self):
+        self.query_changed.emit(
+            self.edit.text(),
+            self.regex_action.isChecked(),
+            self.case_action.isChecked(),
+        )
+
+    def activate(self):
+        """显示搜索栏并选中已有的查询内容"""
+        self.setVisible(True)
+        self.edit.setFocus()
+        self.edit.selectAll()
+
+    def set_error(self, message: str):
+        """正则表达式有误时标红输入框"""
+        self.edit.setStyleSheet("color: red;")
+        self.result_label.setText(message)
+
+    def set_result(self, position: int, total: int):
+        self.edit.setStyleSheet("")
+        if total == 0:
+            self.result_label.setText("无结果")
+        elif position == 0:
+            self.result_label.setText(f"{total} 个结果")
+        else:
+            self.result_label.setText(f"{position}/{total}")
+
+
+if __name__ == "__main__":
+    app = QApplication()
+    bar = SearchBar()
+    bar.query_changed.connect(lambda *args: print("query:", args))
+    bar.previous_requested.connect(lambda: print("previous"))
+    bar.next_requested.connect(lambda: print("next"))
+    bar.closed.connect(app.quit)
+    bar.show()
+    app.exec()
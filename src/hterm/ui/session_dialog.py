@@ -7,6 +7,7 @@ from PySide6.QtWidgets import (
     QComboBox,
     QDialog,
     QDialogButtonBox,
+    QFileDialog,
     QFormLayout,
     QGroupBox,
     QLineEdit,
@@ -16,6 +17,30 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+# 与会话类型无关的配置项，切换会话类型时保留
+COMMON_KEYS = (
+    "name",
+    "log",
+    "record",
+    "reconnect",
+    "scrollback",
+    "fps",
+    "paste_chunk_size",
+    "paste_chunk_delay",
+    "paste_line_delay",
+)
+
+
+def select_data(combo: QComboBox, value, default):
+    """选中数据为 value 的项，value 为空时选中默认项，列表中没有的自定义值追加为新的一项"""
+    if value is None:
+        value = default
+    index = combo.findData(value)
+    if index < 0:
+        combo.addItem(str(value), value)
+        index = combo.count() - 1
+    combo.setCurrentIndex(index)
+
 
 class SessionDialog(QDialog):
     """会话创建窗口"""
@@ -23,6 +48,8 @@ class SessionDialog(QDialog):
     def __init__(self, config: dict = None, parent=None):
         super().__init__(parent)
 
+        # 保留界面上没有的配置项（日志、粘贴节奏等），编辑后不丢失
+        self.config = dict(config or {})
         self.setup_ui()
         if config:
             self.load_config(config)
@@ -30,7 +57,7 @@ class SessionDialog(QDialog):
     def load_config(self, config: dict):
         """加载已有的会话配置"""
         session_type = config.get("type", "ssh").lower()
-        index = {"ssh": 0, "serial": 1, "local": 2}.get(session_type, 0)
+        index = {"ssh": 0, "serial": 1, "local": 2, "replay": 3}.get(session_type, 0)
         self.tabs.setCurrentIndex(index)
 
         if session_type == "ssh":
@@ -41,10 +68,21 @@ class SessionDialog(QDialog):
         elif session_type == "serial":
             self.serial_port.setCurrentText(config.get("port", ""))
             self.serial_baud.setCurrentText(str(config.get("baudrate", "115200")))
+            for combo, key, default in (
+                (self.serial_bytesize, "bytesize", 8),
+                (self.serial_parity, "parity", "N"),
+                (self.serial_stopbits, "stopbits", 1),
+                (self.serial_flow, "flow_control", "none"),
+            ):
+                select_data(combo, config.get(key), default)
         elif session_type == "local":
             self.local_shell.setText(config.get("progname", ""))
+        elif session_type == "replay":
+            self.replay_path.setText(config.get("path", ""))
+            select_data(self.replay_speed, config.get("speed"), 1.0)
 
         self.session_name.setText(config.get("name", ""))
+        select_data(self.reconnect_mode, config.get("reconnect", {}).get("mode"), None)
 
     def setup_ui(self):
         self.setWindowTitle("创建新会话")
@@ -61,7 +99,13 @@ class SessionDialog(QDialog):
 
         self.term_checkbox = QCheckBox("自定义终端配置")
 
+        # 默认值由会话类型决定：串口自动重连，其余手动
+        self.reconnect_mode = QComboBox()
+        for text, mode in (("默认", None), ("手动", "manual"), ("自动", "auto")):
+            self.reconnect_mode.addItem(text, mode)
+
         self.common_layout.addRow("会话别名:", self.session_name)
+        self.common_layout.addRow("断线重连:", self.reconnect_mode)
         self.common_layout.addRow("", self.term_checkbox)
 
         # 创建选项卡
@@ -71,10 +115,12 @@ class SessionDialog(QDialog):
         self.ssh_tab = self._create_ssh_tab()
         self.serial_tab = self._create_serial_tab()
         self.local_tab = self._create_local_tab()
+        self.replay_tab = self._create_replay_tab()
 
         self.tabs.addTab(self.ssh_tab, "SSH")
         self.tabs.addTab(self.serial_tab, "Serial")
         self.tabs.addTab(self.local_tab, "Local")
+        self.tabs.addTab(self.replay_tab, "Replay")
 
         # 底部按钮 (确定/取消)
         self.button_box = QDialogButtonBox(
@@ -143,11 +189,54 @@ class SessionDialog(QDialog):
         self.serial_port.addItems(ports)
         self.serial_baud = QComboBox()
         self.serial_baud.setEditable(True)
-        self.serial_baud.addItems(["9600", "115200", "57600"])
+        self.serial_baud.addItems(
+            [
+                "9600",
+                "57600",
+                "115200",
+                "230400",
+                "460800",
+                "921600",
+                "1500000",
+                "2000000",
+                "3000000",
+            ]
+        )
         self.serial_baud.setCurrentText("115200")
+        # 数据位
+        self.serial_bytesize = QComboBox()
+        for bits in (5, 6, 7, 8):
+            self.serial_bytesize.addItem(str(bits), bits)
+        self.serial_bytesize.setCurrentIndex(self.serial_bytesize.findData(8))
+        # 校验位
+        self.serial_parity = QComboBox()
+        for text, parity in (
+            ("无", "N"),
+            ("奇校验", "O"),
+            ("偶校验", "E"),
+            ("标记", "M"),
+            ("空格", "S"),
+        ):
+            self.serial_parity.addItem(text, parity)
+        # 停止位
+        self.serial_stopbits = QComboBox()
+        for stopbits in (1, 1.5, 2):
+            self.serial_stopbits.addItem(str(stopbits), stopbits)
+        # 流控
+        self.serial_flow = QComboBox()
+        for text, flow in (
+            ("无", "none"),
+            ("RTS/CTS", "rtscts"),
+            ("XON/XOFF", "xonxoff"),
+        ):
+            self.serial_flow.addItem(text, flow)
 
         layout.addRow("串口号:", self.serial_port)
         layout.addRow("波特率:", self.serial_baud)
+        layout.addRow("数据位:", self.serial_bytesize)
+        layout.addRow("校验位:", self.serial_parity)
+        layout.addRow("停止位:", self.serial_stopbits)
+        layout.addRow("流控:", self.serial_flow)
         return widget
 
     def _create_local_tab(self):
@@ -159,6 +248,37 @@ class SessionDialog(QDialog):
         layout.addRow("程序名:", self.local_shell)
         return widget
 
+    def _create_replay_tab(self):
+        widget = QWidget()
+        layout = QFormLayout(widget)
+
+        self.replay_path = QLineEdit()
+        self.replay_path.setPlaceholderText("asciicast 录像文件 (*.cast)")
+        browse_action = QAction(qta.icon("mdi.folder-open-outline"), "浏览", self)
+        browse_action.triggered.connect(self._browse_replay_file)
+        self.replay_path.addAction(browse_action, QLineEdit.TrailingPosition)
+
+        self.replay_speed = QComboBox()
+        for text, speed in (
+            ("1×", 1.0),
+            ("2×", 2.0),
+            ("5×", 5.0),
+            ("10×", 10.0),
+            ("最快", 0.0),
+        ):
+            self.replay_speed.addItem(text, speed)
+
+        layout.addRow("录像文件:", self.replay_path)
+        layout.addRow("回放速度:", self.replay_speed)
+        return widget
+
+    def _browse_replay_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "选择录像文件", "", "asciicast (*.cast);;所有文件 (*)"
+        )
+        if path:
+            self.replay_path.setText(path)
+
     def _toggle_password_visibility(self):
         """切换密码可见性状态"""
         if self.ssh_password.echoMode() == QLineEdit.Password:
@@ -175,9 +295,23 @@ class SessionDialog(QDialog):
         current_index = self.tabs.currentIndex()
         tab_text = self.tabs.tabText(current_index)
 
-        config = {}
+        session_type = tab_text.lower()
+        if self.config.get("type", "ssh").lower() == session_type:
+            config = dict(self.config)
+        else:
+            # 切换了会话类型，只保留通用配置项，丢弃原类型的专属配置
+            config = {k: self.config[k] for k in COMMON_KEYS if k in self.config}
         config["name"] = self.session_name.text()
-        config["type"] = tab_text.lower()
+        config["type"] = session_type
+        reconnect = dict(config.get("reconnect", {}))
+        if self.reconnect_mode.currentData():
+            reconnect["mode"] = self.reconnect_mode.currentData()
+        else:
+            reconnect.pop("mode", None)
+        if reconnect:
+            config["reconnect"] = reconnect
+        else:
+            config.pop("reconnect", None)
 
         if config["type"] == "ssh":
             config["server"] = self.ssh_host.text()
@@ -187,8 +321,15 @@ class SessionDialog(QDialog):
         elif config["type"] == "serial":
             config["port"] = self.serial_port.currentText()
             config["baudrate"] = int(self.serial_baud.currentText())
+            config["bytesize"] = self.serial_bytesize.currentData()
+            config["parity"] = self.serial_parity.currentData()
+            config["stopbits"] = self.serial_stopbits.currentData()
+            config["flow_control"] = self.serial_flow.currentData()
         elif config["type"] == "local":
             config["progname"] = self.local_shell.text()
+        elif config["type"] == "replay":
+            config["path"] = self.replay_path.text()
+            config["speed"] = self.replay_speed.currentData()
 
         return config
 
@@ -1,3 +1,5 @@
+import pathlib
+
 import qtawesome as qta
 from PySide6.QtCore import QPoint, Qt, Signal
 from PySide6.QtGui import QAction
@@ -29,6 +31,9 @@ class SessionItem(QListWidgetItem):
         elif config["type"] == "local":
             name = config["progname"]
             icon = qta.icon("ri.mini-program-line")
+        elif config["type"] == "replay":
+            name = pathlib.Path(config["path"]).name
+            icon = qta.icon("mdi.play-circle-outline")
 
         # 别名不为空，使用别名
         if config["name"]:
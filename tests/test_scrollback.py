@@ -0,0 +1,83 @@
+from pyte.screens import Char
+
+from hterm.scrollback import CompactHistory, CompactLine, DiskHistory, StyleTable
+
+
+def make_line(text: str, **style) -> dict:
+    return {x: Char(c, **style) for x, c in enumerate(text)}
+
+
+def cells(line: dict) -> list[tuple]:
+    return [tuple(line[x]) for x in range(max(line) + 1)] if line else []
+
+
+LINES = [
+    make_line("plain ascii"),
+    make_line("red on blue", fg="red", bg="blue", bold=True),
+    # 宽字符后跟占位的空单元格
+    {0: Char("你"), 1: Char(""), 2: Char("好"), 3: Char(""), 4: Char("!")},
+    # 叠加超过 255 个组合字符的单元格
+    {0: Char("e" + "\u0301" * 300), 1: Char("x", fg="green")},
+    {},
+]
+
+
+def test_dump_load_round_trip():
+    table = StyleTable()
+    for line in LINES:
+        compact = CompactLine(line, table)
+        text, meta = compact.dump()
+        assert text.endswith(b"\n")
+        loaded = CompactLine.load(text[:-1], meta, table)
+        assert loaded.key == compact.key
+        assert cells(loaded.materialize()) == cells(line)
+
+
+def test_compact_history_clear_keeps_old_lines_valid():
+    history = CompactHistory(10)
+    history.append(LINES[1])
+    line = history.line(0)
+    history.clear()
+    history.append(LINES[0])
+    assert cells(line.materialize()) == cells(LINES[1])
+    assert line.key != history.line(0).key
+
+
+def test_spill_and_pop_round_trip(tmp_path):
+    history = DiskHistory(str(tmp_path / "h"), 2)
+    for line in LINES:
+        history.append(line)
+    assert history.spilled == len(LINES) - 2
+    assert [cells(line) for line in history] == [cells(line) for line in LINES]
+    popped = [history.pop() for _ in range(len(LINES))]
+    assert [cells(line) for line in reversed(popped)] == [cells(x) for x in LINES]
+    assert len(history) == 0
+    history.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_appendleft_and_popleft(tmp_path):
+    history = DiskHistory(str(tmp_path / "h"), 2)
+    for line in LINES[:3]:
+        history.append(line)
+    history.appendleft(LINES[3])
+    expected = [LINES[3], *LINES[:3]]
+    assert [cells(line) for line in history] == [cells(x) for x in expected]
+    assert cells(history.popleft()) == cells(LINES[3])
+    assert cells(history.popleft()) == cells(LINES[0])
+    assert [cells(line) for line in history] == [cells(x) for x in LINES[1:3]]
+    history.close(keep=True)
+    assert (tmp_path / "h.txt").read_text() == "red on blue\n你好!\n"
+
+
+def test_disk_history_does_not_share_files(tmp_path):
+    first = DiskHistory(str(tmp_path / "h"), 1)
+    second = DiskHistory(str(tmp_path / "h"), 1)
+    assert first.text_path != second.text_path
+    for history, text in ((first, "first"), (second, "second")):
+        history.append(make_line(text))
+        history.append(make_line("last"))
+    assert cells(first[0]) == cells(make_line("first"))
+    assert cells(second[0]) == cells(make_line("second"))
+    first.close()
+    second.close()
@@ -0,0 +1,81 @@
+import json
+import re
+
+from hterm.session_log import (
+    LOG_MODE_RAW,
+    LOG_MODE_TEXT,
+    LOG_MODE_TIMESTAMP,
+    SessionLogger,
+)
+from hterm.session_record import SessionRecorder
+
+# 带颜色、光标移动和标题设置的输出，控制序列被分块截断
+CHUNKS = [
+    b"\x1b]0;title\x07\x1b[1;32muser@host\x1b[0m:~$ ls\r\n",
+    b"a.txt  \x1b[01;3",
+    b"4mdir\x1b[0m\r\n\xe4\xbd\xa0",
+    b"\xe5\xa5\xbd\r\n\x1b[K",
+]
+TEXT = "user@host:~$ ls\na.txt  dir\n你好\n"
+
+
+def write_log(path, mode):
+    logger = SessionLogger(path, mode)
+    for chunk in CHUNKS:
+        logger.write(chunk)
+    logger.close()
+    return path.read_bytes()
+
+
+def test_raw_log_keeps_bytes(tmp_path):
+    assert write_log(tmp_path / "raw.log", LOG_MODE_RAW) == b"".join(CHUNKS)
+
+
+def test_text_log_strips_escapes(tmp_path):
+    assert write_log(tmp_path / "text.log", LOG_MODE_TEXT).decode() == TEXT
+
+
+def test_timestamp_log_prefixes_lines(tmp_path):
+    lines = write_log(tmp_path / "ts.log", LOG_MODE_TIMESTAMP).decode().splitlines()
+    prefix = re.compile(r"^\[\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d{3}\] ")
+    assert all(prefix.match(line) for line in lines)
+    assert [prefix.sub("", line) for line in lines] == TEXT.splitlines()
+
+
+def test_log_appends_to_existing_file(tmp_path):
+    path = tmp_path / "text.log"
+    write_log(path, LOG_MODE_TEXT)
+    assert write_log(path, LOG_MODE_TEXT).decode() == TEXT * 2
+
+
+def read_cast(path):
+    header, *events = (json.loads(line) for line in path.read_text().splitlines())
+    return header, events
+
+
+def test_recorder_round_trip(tmp_path):
+    recorder = SessionRecorder(tmp_path / "a.cast", 80, 24)
+    recorder.write(CHUNKS[0])
+    recorder.resize(40, 100)
+    for chunk in CHUNKS[1:]:
+        recorder.write(chunk)
+    recorder.close()
+
+    header, events = read_cast(tmp_path / "a.cast")
+    assert header["version"] == 2
+    assert (header["width"], header["height"]) == (80, 24)
+    assert [e[2] for e in events if e[1] == "r"] == ["100x40"]
+    output = "".join(e[2] for e in events if e[1] == "o")
+    assert output == b"".join(CHUNKS).decode()
+    times = [e[0] for e in events]
+    assert times == sorted(times)
+
+
+def test_recorder_does_not_overwrite(tmp_path):
+    paths = []
+    for _ in range(3):
+        recorder = SessionRecorder(tmp_path / "a.cast", 80, 24)
+        recorder.write(b"x")
+        recorder.close()
+        paths.append(recorder.path.name)
+    assert paths == ["a.cast", "a-1.cast", "a-2.cast"]